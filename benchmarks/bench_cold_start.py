@@ -0,0 +1,98 @@
+"""
+Benchmark of the cold start of the app
+
+Reports the import-time breakdown of `app` and the time from process start
+until the first /calculation response, and fails if it exceeds the target.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 5] [--target 3.0]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Cold start target in seconds (process start -> first response)
+DEFAULT_TARGET = 3.0
+TOP_IMPORTS = 10
+
+CHILD_SCRIPT = '''
+import json, time
+start = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+res = app.test_client().get(
+    '/calculation?A=3.3,4.1,20,5000,300000,1,3.2,1&B=8,1.8,20,5200,200000,0,4.5,1'
+)
+assert res.status_code == 200, res.data
+print(json.dumps({
+    'import': imported - start,
+    'firstRequest': time.perf_counter() - imported,
+}))
+'''
+
+
+def import_time_breakdown() -> list[tuple[str, int]]:
+    """Return (module, cumulative microseconds) of modules imported by `app`"""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=SRC_DIR,
+        env={**os.environ, 'WARM_UP': 'false'},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:') :].split('|')
+        modules.append((name.strip(), int(cumulative)))
+    return sorted(modules, key=lambda m: m[1], reverse=True)
+
+
+def cold_start() -> dict:
+    """Start a new interpreter and measure the time until the first response"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = time.perf_counter() - start
+    return {**json.loads(proc.stdout.splitlines()[-1]), 'total': total}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target', type=float, default=DEFAULT_TARGET)
+    args = parser.parse_args()
+
+    print(f'Top {TOP_IMPORTS} imports (cumulative):')
+    for name, usec in import_time_breakdown()[:TOP_IMPORTS]:
+        print(f'  {name:<40} {usec / 1000:>8.1f} ms')
+
+    results = [cold_start() for _ in range(args.runs)]
+    print(f'\nCold start (median of {args.runs} runs):')
+    for key in ('import', 'firstRequest', 'total'):
+        median = statistics.median(r[key] for r in results)
+        print(f'  {key:<40} {median * 1000:>8.1f} ms')
+
+    total = statistics.median(r['total'] for r in results)
+    if total > args.target:
+        print(f'\nFAILED: cold start {total:.2f}s exceeds target {args.target:.2f}s')
+        sys.exit(1)
+    print(f'\nOK: cold start {total:.2f}s within target {args.target:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark of the rebalanced portfolio simulation
+
+Compares the vectorized rebalancing engine with the per-asset simulation of
+`get_density_dist` for portfolios of 1 to 10 assets over 20 years.
+
+Usage:
+    python benchmarks/bench_rebalance.py
+"""
+
+import os
+import sys
+import time
+from typing import Any, Callable
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from asset_calc import Asset, get_density_dist  # noqa: E402
+from rebalance import get_rebalanced_density_dist  # noqa: E402
+from utils import set_seed  # noqa: E402
+
+
+def make_assets(n: int) -> list[Asset]:
+    assets = [
+        Asset(f'asset{i}', 3 + i, 1.0, 20, 5000, 300000, i % 2, 5 + 2 * i, i % 2)
+        for i in range(n)
+    ]
+    for A in assets:
+        A.set_price_transition()
+    return assets
+
+
+def measure(func: Callable[..., object], *args: Any, **kwargs: Any) -> float:
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    print(
+        f'{"assets":>6} {"density [ms]":>13} {"rebalance annual [ms]":>22} '
+        f'{"rebalance monthly [ms]":>23}'
+    )
+    for n in (1, 5, 10):
+        assets = make_assets(n)
+        set_seed(1)
+        density = measure(get_density_dist, assets)
+        annual = measure(get_rebalanced_density_dist, assets, rebalance='annual')
+        monthly = measure(get_rebalanced_density_dist, assets, rebalance='monthly')
+        print(f'{n:>6} {density:>13.1f} {annual:>22.1f} {monthly:>23.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of response serialization for the /calculation endpoint
+
+Usage:
+    python benchmarks/bench_serialization.py
+"""
+
+import gzip
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from flask import Flask, jsonify  # noqa: E402
+
+from asset_calc import (  # noqa: E402
+    Asset,
+    Constants,
+    get_demolition_price,
+    get_density_dist,
+    get_dividend_price,
+    get_ratio_asset,
+    get_total_transition,
+)
+from serialization import encode_json  # noqa: E402
+from utils import set_seed  # noqa: E402
+
+REPEAT = 200
+
+
+def make_response_data() -> dict:
+    """Build a /calculation response for a 20-year, 1000-path portfolio"""
+    set_seed(1)
+    assets = [
+        Asset('三菱UFJ', 3.3, 4.1, 20, 5000, 300000, 1, 3.2, 1),
+        Asset('APPL', 8, 1.8, 20, 5200, 200000, 0, 4.5, 1),
+        Asset('伊藤忠商事', 5.5, 3.2, 20, 5000, 100, 1, 2.3, 0),
+        Asset('GOOGL', 11.3, 0.2, 20, 5500, 0, 0, 5.2, 0),
+    ]
+    for A in assets:
+        A.set_price_transition()
+    return {
+        'transition': get_total_transition(assets),
+        'pie': get_ratio_asset(assets),
+        'density': get_density_dist(
+            assets, simulation_time=Constants.DEFAULT_SIMULATION_TIME
+        ),
+        'bar': get_dividend_price(assets),
+        'demolition': get_demolition_price(assets, duration=20),
+    }
+
+
+def main() -> None:
+    data = make_response_data()
+    app = Flask(__name__)
+
+    with app.app_context():
+        # jsonify cannot encode ndarrays, so the baseline converts them first
+        def encode_jsonify() -> bytes:
+            density = data['density']
+            payload = {**data, 'density': {**density, 'data': density['data'].tolist()}}
+            return jsonify(payload).get_data()
+
+        results = {
+            'jsonify': encode_jsonify,
+            'encode_json': lambda: encode_json(data),
+        }
+        print(f'{"encoder":<12} {"encode [ms]":>12} {"raw [B]":>9} {"gzip [B]":>9}')
+        for name, func in results.items():
+            body = func()
+            msec = timeit.timeit(func, number=REPEAT) / REPEAT * 1000
+            gz = len(gzip.compress(body))
+            print(f'{name:<12} {msec:>12.3f} {len(body):>9} {gz:>9}')
+
+
+if __name__ == '__main__':
+    main()
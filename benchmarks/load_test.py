@@ -0,0 +1,308 @@
+"""
+Load test of the app under gunicorn with a matrix of worker/thread settings
+
+For each configuration, starts gunicorn, drives a mix of /calculation and
+/re-calculation requests at increasing concurrency and reports throughput,
+p50/p95/p99 latency, non-200 responses and the peak RSS of the master and its
+workers. Every request has unique parameters, so neither the result cache nor
+ETags are hit.
+
+Unless set in the environment, the admission limits follow the thread count
+(MAX_CONCURRENT_CALCULATIONS = threads, unbounded queue), so the matrix
+measures the server rather than the limiter.
+
+Linux only: RSS is read from /proc and --cpus uses sched_setaffinity. On
+macOS, run it inside the Docker image.
+
+Usage:
+    python benchmarks/load_test.py [--workers 1,2] [--threads 1,2,4,8]
+        [--concurrency 1,4,8,16] [--duration 10] [--cpus 1]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import IO, Iterator, Optional
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+STARTUP_TIMEOUT = 30.0  # seconds until gunicorn answers
+RSS_INTERVAL = 0.2  # seconds between RSS samples
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+
+def parse_ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(',')]
+
+
+def calculation_path(i: int) -> str:
+    """Typical 2-asset portfolio; the contribution varies so every request misses"""
+    return (
+        f'/calculation?A=3.3,4.1,20,{5000 + i},300000,1,3.2,1'
+        '&B=8,1.8,20,5200,200000,0,4.5,1'
+    )
+
+
+def re_calculation_path(i: int) -> str:
+    return (
+        f'/re-calculation?A=3.3,4.1,20,{5000 + i},300000,1,3.2,1'
+        f'&B=8,1.8,20,5200,200000,0,4.5,1&duration={10 + i % 20}'
+    )
+
+
+def get(base_url: str, path: str) -> tuple[int, float]:
+    """Send a request and return (status, latency in seconds)"""
+    start = time.perf_counter()
+    request = urllib.request.Request(
+        base_url + path, headers={'Accept-Encoding': 'gzip'}
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except OSError:
+        status = 0
+    return status, time.perf_counter() - start
+
+
+def get_rss(pid: int) -> int:
+    """Return the RSS in bytes of a process and all its descendants"""
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # the command name may contain spaces, fields follow the last ')'
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    rss = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f'/proc/{current}/statm') as f:
+                rss += int(f.read().split()[1]) * PAGE_SIZE
+        except OSError:
+            continue
+        stack.extend(children.get(current, []))
+    return rss
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return float('nan')
+    return values[min(int(len(values) * q / 100), len(values) - 1)]
+
+
+def get_latency_stats(latencies: list[float]) -> dict:
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+    }
+
+
+def start_server(
+    workers: int, threads: int, port: int, cpus: Optional[int], log: IO
+) -> subprocess.Popen:
+    """Start gunicorn and wait until it answers"""
+    env = {
+        'MAX_CONCURRENT_CALCULATIONS': str(threads),
+        'MAX_QUEUED_CALCULATIONS': '100000',
+        **os.environ,
+        'PROFILING_ENABLED': 'false',
+    }
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            '-m',
+            'gunicorn',
+            '--bind',
+            f'127.0.0.1:{port}',
+            '--log-level',
+            'warning',
+            '--workers',
+            str(workers),
+            '--threads',
+            str(threads),
+            '--timeout',
+            '0',
+            'app:app',
+        ],
+        cwd=SRC_DIR,
+        env=env,
+        stdout=log,
+        stderr=log,
+        # pin the server like a Cloud Run instance with `cpus` vCPUs
+        preexec_fn=(lambda: os.sched_setaffinity(0, range(cpus))) if cpus else None,
+    )
+
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with {proc.returncode}')
+        if get(base_url, re_calculation_path(-1))[0] == 200:
+            return proc
+        time.sleep(0.2)
+    stop_server(proc)
+    raise RuntimeError('gunicorn did not start in time')
+
+
+def stop_server(proc: subprocess.Popen) -> None:
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def run_level(
+    base_url: str,
+    pid: int,
+    concurrency: int,
+    duration: float,
+    recalc_ratio: float,
+    counter: Iterator[int],
+) -> dict:
+    """Drive the server with `concurrency` clients for `duration` seconds
+
+    `counter` numbers the requests and is shared by the whole run, so no
+    parameters repeat across levels served by the same server.
+    """
+    latencies: dict[str, list[float]] = {'calculation': [], 're-calculation': []}
+    errors = 0
+    lock = threading.Lock()
+    stop = threading.Event()
+    peak_rss = get_rss(pid)
+
+    def client() -> None:
+        nonlocal errors
+        while not stop.is_set():
+            i = next(counter)
+            # deterministic mix: `recalc_ratio` of every 100 requests
+            if i % 100 < recalc_ratio * 100:
+                endpoint, path = 're-calculation', re_calculation_path(i)
+            else:
+                endpoint, path = 'calculation', calculation_path(i)
+            status, latency = get(base_url, path)
+            with lock:
+                if status == 200:
+                    latencies[endpoint].append(latency)
+                else:
+                    errors += 1
+
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in clients:
+        thread.start()
+    while time.perf_counter() - start < duration:
+        time.sleep(RSS_INTERVAL)
+        peak_rss = max(peak_rss, get_rss(pid))
+    stop.set()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'concurrency': concurrency,
+        **get_latency_stats(sum(latencies.values(), [])),
+        'errors': errors,
+        'throughput': sum(len(v) for v in latencies.values()) / elapsed,
+        'peakRssMiB': peak_rss / 1024 / 1024,
+        'endpoints': {
+            endpoint: get_latency_stats(values)
+            for endpoint, values in latencies.items()
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--workers', type=parse_ints, default=[1, 2])
+    parser.add_argument('--threads', type=parse_ints, default=[1, 2, 4, 8])
+    parser.add_argument('--concurrency', type=parse_ints, default=[1, 4, 8, 16])
+    parser.add_argument(
+        '--duration', type=float, default=10.0, help='seconds per concurrency level'
+    )
+    parser.add_argument(
+        '--recalc-ratio',
+        type=float,
+        default=0.5,
+        help='share of /re-calculation requests',
+    )
+    parser.add_argument(
+        '--cpus', type=int, help='pin gunicorn to this many CPUs (deploy uses 1)'
+    )
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument(
+        '--server-log', default=os.devnull, help='file receiving the gunicorn output'
+    )
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+    if not sys.platform.startswith('linux'):
+        sys.exit(
+            'load_test.py needs Linux (/proc and sched_setaffinity); '
+            'run it inside the Docker image'
+        )
+
+    results = []
+    print(
+        f'{"workers":>7} {"threads":>7} {"conc":>5} {"req/s":>8} {"p50 ms":>8} '
+        f'{"p95 ms":>8} {"p99 ms":>8} {"errors":>6} {"RSS MiB":>8}'
+    )
+    log = open(args.server_log, 'ab')
+    counter = itertools.count()
+    for workers, threads in itertools.product(args.workers, args.threads):
+        proc = start_server(workers, threads, args.port, args.cpus, log)
+        try:
+            for concurrency in args.concurrency:
+                res = run_level(
+                    f'http://127.0.0.1:{args.port}',
+                    proc.pid,
+                    concurrency,
+                    args.duration,
+                    args.recalc_ratio,
+                    counter,
+                )
+                res = {'workers': workers, 'threads': threads, **res}
+                results.append(res)
+                print(
+                    f'{workers:>7} {threads:>7} {concurrency:>5} '
+                    f'{res["throughput"]:>8.1f} {res["p50"] * 1000:>8.0f} '
+                    f'{res["p95"] * 1000:>8.0f} {res["p99"] * 1000:>8.0f} '
+                    f'{res["errors"]:>6} {res["peakRssMiB"]:>8.1f}',
+                    flush=True,
+                )
+        finally:
+            stop_server(proc)
+    log.close()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Admission control for CPU-bound calculation requests
+"""
+
+import math
+import os
+import threading
+from typing import Optional
+
+from asset_calc import Constants
+
+
+class AdmissionConstants:
+    """Default limits used by admission control"""
+
+    # Per-request cost budget (assets x horizon months x simulation paths).
+    # 10 assets simulated for 20 years with 1000 paths fits in the budget.
+    DEFAULT_MAX_REQUEST_COST = (
+        10
+        * Constants.MAX_YEARS
+        * Constants.MONTHS_IN_YEAR
+        * Constants.DEFAULT_SIMULATION_TIME
+    )
+
+    # Concurrency limits
+    DEFAULT_MAX_CONCURRENT = 2
+    DEFAULT_MAX_QUEUED = 6
+    DEFAULT_QUEUE_TIMEOUT = 10.0  # seconds
+
+    # Index of `year` in the asset parameter list
+    YEAR_INDEX = 2
+
+
+def estimate_cost(
+    asset_params: list[list[float]], simulation_time: int, duration: int = 0
+) -> int:
+    """Estimate the computation cost of a request before running it
+
+    Args:
+        asset_params: Parameter list of each asset (same order as Asset arguments)
+        simulation_time: Number of Monte Carlo paths (0 when no simulation runs)
+        duration: Demolition duration in years (0 when not calculated)
+
+    Returns:
+        Estimated cost as assets x horizon months x paths
+    """
+    if not asset_params:
+        return 0
+    max_year = max(
+        (
+            max(data[AdmissionConstants.YEAR_INDEX], 0)
+            if len(data) > AdmissionConstants.YEAR_INDEX
+            else 0
+        )
+        for data in asset_params
+    )
+    # deterministic transition is always computed for MAX_YEARS
+    horizon_months = (
+        max(max_year, duration, Constants.MAX_YEARS) * Constants.MONTHS_IN_YEAR
+    )
+    return int(len(asset_params) * horizon_months * max(simulation_time, 1))
+
+
+class ConcurrencyLimiter:
+    """Semaphore-based limiter that queues or rejects work beyond capacity"""
+
+    def __init__(self, max_concurrent: int, max_queued: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._counters = {
+            'admitted': 0,
+            'queued': 0,
+            'rejectedBusy': 0,
+            'rejectedCost': 0,
+        }
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait before retrying"""
+        return max(1, math.ceil(self.queue_timeout))
+
+    def acquire(self) -> bool:
+        """Acquire a slot, waiting in the queue if all slots are busy
+
+        Returns:
+            True if the request is admitted, False if it has to be rejected
+        """
+        if self._semaphore.acquire(blocking=False):
+            self._count('admitted')
+            return True
+
+        with self._lock:
+            if self._waiting >= self.max_queued:
+                self._counters['rejectedBusy'] += 1
+                return False
+            self._waiting += 1
+            self._counters['queued'] += 1
+
+        try:
+            acquired = self._semaphore.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        self._count('admitted' if acquired else 'rejectedBusy')
+        return acquired
+
+    def release(self) -> None:
+        """Release a slot acquired by `acquire`"""
+        self._semaphore.release()
+
+    def reject_cost(self) -> None:
+        """Record a request rejected for exceeding the cost budget"""
+        self._count('rejectedCost')
+
+    def stats(self) -> dict:
+        """Return a snapshot of the limiter counters"""
+        with self._lock:
+            return {**self._counters, 'waiting': self._waiting}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counters[key] += 1
+
+
+def _get_env_number(var: str, default: float) -> float:
+    value: Optional[str] = os.getenv(var)
+    return float(value) if value else default
+
+
+def get_max_request_cost() -> int:
+    """Per-request cost budget (env: MAX_REQUEST_COST)"""
+    return int(
+        _get_env_number('MAX_REQUEST_COST', AdmissionConstants.DEFAULT_MAX_REQUEST_COST)
+    )
+
+
+def make_limiter() -> ConcurrencyLimiter:
+    """Create a limiter configured from environment variables"""
+    return ConcurrencyLimiter(
+        max_concurrent=int(
+            _get_env_number(
+                'MAX_CONCURRENT_CALCULATIONS', AdmissionConstants.DEFAULT_MAX_CONCURRENT
+            )
+        ),
+        max_queued=int(
+            _get_env_number(
+                'MAX_QUEUED_CALCULATIONS', AdmissionConstants.DEFAULT_MAX_QUEUED
+            )
+        ),
+        queue_timeout=_get_env_number(
+            'CALCULATION_QUEUE_TIMEOUT', AdmissionConstants.DEFAULT_QUEUE_TIMEOUT
+        ),
+    )
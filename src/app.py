@@ -2,25 +2,58 @@
 Flask App main modules
 """
 
+import functools
 import os
+import time
 import urllib.parse
+from typing import Any, Callable, Optional
 
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 
+from admission import estimate_cost, get_max_request_cost, make_limiter
 from asset_calc import (
     Asset,
+    Constants,
+    get_calculation_result,
     get_demolition_price,
     get_density_dist,
     get_dividend_price,
     get_ratio_asset,
     get_total_transition,
 )
-from utils import make_logger, set_seed
+from goal_seek import GoalSeekConstants, solve_goal
+from http_cache import conditional_get
+from rebalance import RebalanceConstants, get_rebalanced_density_dist
+from request_profiler import (
+    ProfilingConstants,
+    is_profile_requested,
+    make_profile_capture,
+    profiled,
+)
+from result_cache import cached_response, make_result_cache
+from serialization import compress_response, encode_json, make_json_response
+from sweep import (
+    SweepConstants,
+    estimate_sweep_cost,
+    parse_sweep_options,
+    sweep_parameters,
+)
+from utils import make_logger
 
 app = Flask(__name__)
 logger = make_logger()
 
+# Admission control for CPU-bound calculations
+limiter = make_limiter()
+max_request_cost = get_max_request_cost()
+
+# Cache of results (shared by workers when RESULT_CACHE_PATH is set)
+result_cache = make_result_cache()
+
+# Opt-in profiling (PROFILING_ENABLED=true and X-Profile header)
+profile_capture = make_profile_capture()
+
 # Create list of origins
 env_vars = [
     'FRONTEND_URL_1',
@@ -36,6 +69,8 @@ for var in env_vars:
 
 CORS(app, origins=origins)
 
+app.after_request(compress_response)
+
 # get firebase info
 firebase_project_name = os.getenv('FIREBASE_PROJECT_NAME', None)
 
@@ -47,14 +82,18 @@ def add_cors_headers(response):
         origin_cleaned = origin.rstrip('/')
         if origin_is_allowed(origin_cleaned):
             response.headers['Access-Control-Allow-Origin'] = origin_cleaned
-            response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+            response.headers['Access-Control-Allow-Headers'] = (
+                f'Content-Type,{ProfilingConstants.HEADER}'
+            )
             response.headers['Access-Control-Allow-Methods'] = (
                 'GET,PUT,POST,DELETE,OPTIONS'
             )
     else:
         if os.getenv("ALLOW_NO_ORIGIN", "true") == "true":
             response.headers['Access-Control-Allow-Origin'] = '*'
-            response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+            response.headers['Access-Control-Allow-Headers'] = (
+                f'Content-Type,{ProfilingConstants.HEADER}'
+            )
             response.headers['Access-Control-Allow-Methods'] = (
                 'GET,PUT,POST,DELETE,OPTIONS'
             )
@@ -73,40 +112,108 @@ def origin_is_allowed(origin: str) -> bool:
         return domain in origins
 
 
-def get_params() -> list[tuple[str, list[float]]]:
-    """Parse request parameters"""
+def get_params(options: tuple[str, ...] = ()) -> list[tuple[str, list[float]]]:
+    """Parse request parameters
+
+    Args:
+        options: Names of query parameters that are options, not stocks
+    """
     params = [
         (
             urllib.parse.unquote(key),  # stock name (str)
             list(map(float, value.split(','))),  # stock data (list)
         )
         for key, value in request.args.to_dict().items()
+        if key not in options
     ]
     return params
 
 
+def profile_allowed() -> bool:
+    """Only requests from allowed origins may be profiled"""
+    origin = request.headers.get('Origin')
+    if not origin:
+        return False
+    return origin_is_allowed(origin.rstrip('/'))
+
+
+def bypass_cache() -> bool:
+    """Profiled requests run the calculation even if its result is cached"""
+    return is_profile_requested(profile_capture, profile_allowed)
+
+
+def admission_control(
+    simulation_time: int,
+    has_duration: bool = False,
+    options: tuple[str, ...] = (),
+    estimate: Optional[Callable[[list[tuple[str, list[float]]]], int]] = None,
+) -> Callable:
+    """Reject requests over the cost budget and limit concurrent calculations
+
+    Args:
+        simulation_time: Number of Monte Carlo paths the route runs per asset
+        has_duration: True if the last query parameter is the demolition duration
+        options: Names of query parameters that are options, not stocks
+        estimate: Returns the cost of the parsed stocks, replacing `estimate_cost`
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                params = get_params(options)
+                duration = int(params.pop()[1][0]) if has_duration else 0
+                if estimate is not None:
+                    cost = estimate(params)
+                else:
+                    asset_params = [stock_data for _, stock_data in params]
+                    cost = estimate_cost(asset_params, simulation_time, duration)
+            except (ValueError, IndexError, OverflowError):
+                # malformed parameters are reported by the route itself
+                cost = 0
+
+            if cost > max_request_cost:
+                limiter.reject_cost()
+                logger.warning(
+                    f'calculation rejected: cost {cost} > {max_request_cost}, '
+                    f'stats: {limiter.stats()}'
+                )
+                return (
+                    jsonify({'error': f'request cost {cost} exceeds the budget'}),
+                    400,
+                )
+
+            if not limiter.acquire():
+                logger.warning(f'calculation rejected: busy, stats: {limiter.stats()}')
+                return (
+                    jsonify({'error': 'server is busy'}),
+                    429,
+                    {'Retry-After': str(limiter.retry_after)},
+                )
+            try:
+                return view(*args, **kwargs)
+            finally:
+                limiter.release()
+
+        return wrapper
+
+    return decorator
+
+
 @app.route('/calculation', methods=['GET'])
+@conditional_get(bypass=bypass_cache)
+@cached_response(result_cache, bypass=bypass_cache)
+@admission_control(simulation_time=Constants.DEFAULT_SIMULATION_TIME)
+@profiled(profile_capture, profile_allowed)
 def calculation():
     """Return response of calculation"""
-    set_seed(1)
     try:
         params = get_params()
         logger.info(f'calculation params: {params}')
 
-        assets = [Asset(stock_name, *stock_data) for stock_name, stock_data in params]
-        for A in assets:
-            A.set_price_transition()
-
-        res = {}
-        res['transition'] = get_total_transition(assets)  # Using Transition Chart
-        res['pie'] = get_ratio_asset(assets)  # Using Pie Chart
-        res['density'] = get_density_dist(assets)  # Using Density Chart
-        res['bar'] = get_dividend_price(assets)  # Using Bar Chart
-        res['demolition'] = get_demolition_price(
-            assets, duration=20
-        )  # Using Demolition Chart
+        res = get_calculation_result(params)
 
-        stock_json = jsonify(res)
+        stock_json = make_json_response(res)
         logger.info('calculation success')
 
         return stock_json, 200
@@ -117,6 +224,10 @@ def calculation():
 
 
 @app.route('/re-calculation', methods=['GET'])
+@conditional_get(bypass=bypass_cache)
+@cached_response(result_cache, bypass=bypass_cache)
+@admission_control(simulation_time=0, has_duration=True)
+@profiled(profile_capture, profile_allowed)
 def re_calculation():
     """Return response of re-calculation"""
     try:
@@ -134,7 +245,7 @@ def re_calculation():
             assets, duration=int(params[-1][1][0])
         )  # Using Demolition Chart
 
-        stock_json = jsonify(res)
+        stock_json = make_json_response(res)
         return stock_json, 200
 
     except Exception as e:
@@ -142,5 +253,134 @@ def re_calculation():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/goal-seek', methods=['GET'])
+@conditional_get(bypass=bypass_cache)
+@cached_response(result_cache, bypass=bypass_cache)
+@admission_control(
+    simulation_time=Constants.DEFAULT_SIMULATION_TIME,
+    options=GoalSeekConstants.OPTIONS,
+)
+@profiled(profile_capture, profile_allowed)
+def goal_seek() -> Any:
+    """Return response of goal-seek"""
+    try:
+        params = get_params(GoalSeekConstants.OPTIONS)
+        logger.info(f'goal-seek params: {params}, options: {request.args}')
+
+        assets = [Asset(stock_name, *stock_data) for stock_name, stock_data in params]
+        for A in assets:
+            A.set_price_transition()
+
+        target = request.args.get('target', type=float)
+        probability = request.args.get('probability', type=float)
+        if target is None or probability is None:
+            raise ValueError('target and probability are required')
+
+        res = solve_goal(
+            assets,
+            target=target,
+            probability=probability,
+            solve=request.args.get('solve', GoalSeekConstants.SOLVE_RESERVED),
+        )
+
+        stock_json = make_json_response(res)
+        return stock_json, 200
+
+    except Exception as e:
+        logger.error(f'goal-seek error: {e}', exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/rebalance', methods=['GET'])
+@conditional_get(bypass=bypass_cache)
+@cached_response(result_cache, bypass=bypass_cache)
+@admission_control(
+    simulation_time=Constants.DEFAULT_SIMULATION_TIME,
+    options=RebalanceConstants.OPTIONS,
+)
+@profiled(profile_capture, profile_allowed)
+def rebalance() -> Any:
+    """Return response of rebalanced portfolio simulation"""
+    try:
+        params = get_params(RebalanceConstants.OPTIONS)
+        logger.info(f'rebalance params: {params}, options: {request.args}')
+
+        assets = [Asset(stock_name, *stock_data) for stock_name, stock_data in params]
+        for A in assets:
+            A.set_price_transition()
+
+        res = {}
+        res['density'] = get_rebalanced_density_dist(
+            assets,
+            rebalance=request.args.get('rebalance', RebalanceConstants.ANNUAL),
+        )  # Using Density Chart
+
+        stock_json = make_json_response(res)
+        return stock_json, 200
+
+    except Exception as e:
+        logger.error(f'rebalance error: {e}', exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
+def estimate_sweep_request(params: list[tuple[str, list[float]]]) -> int:
+    """Estimate the cost of the current /sweep request"""
+    return estimate_sweep_cost(
+        params, parse_sweep_options(request.args), SweepConstants.SIMULATION_TIME
+    )
+
+
+@app.route('/sweep', methods=['GET'])
+@conditional_get(bypass=bypass_cache)
+@cached_response(result_cache, bypass=bypass_cache)
+@admission_control(
+    simulation_time=SweepConstants.SIMULATION_TIME,
+    options=SweepConstants.OPTIONS,
+    estimate=estimate_sweep_request,
+)
+@profiled(profile_capture, profile_allowed)
+def sweep() -> Any:
+    """Return response of parameter sweep"""
+    try:
+        params = get_params(SweepConstants.OPTIONS)
+        logger.info(f'sweep params: {params}, options: {request.args}')
+
+        assets = [Asset(stock_name, *stock_data) for stock_name, stock_data in params]
+        for A in assets:
+            A.set_price_transition()
+
+        res = sweep_parameters(assets, **parse_sweep_options(request.args))
+
+        stock_json = make_json_response(res)
+        return stock_json, 200
+
+    except Exception as e:
+        logger.error(f'sweep error: {e}', exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
+def warm_up() -> None:
+    """Run one tiny calculation to prime NumPy and the response encoder"""
+    start = time.perf_counter()
+    assets = [Asset('warm-up', 5.0, 2.0, 1, 10000, 100000, 1, 10.0, 1)]
+    for A in assets:
+        A.set_price_transition()
+    res = {
+        'transition': get_total_transition(assets),
+        'pie': get_ratio_asset(assets),
+        'density': get_density_dist(
+            assets, simulation_time=Constants.PERCENTILE_DIVISOR
+        ),
+        'bar': get_dividend_price(assets),
+        'demolition': get_demolition_price(assets, duration=1),
+    }
+    encode_json(res)
+    logger.info(f'warm-up done in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+
+if os.getenv('WARM_UP', 'true') == 'true':
+    warm_up()
+
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080)
@@ -2,10 +2,9 @@
 Main functions
 """
 
-import collections
 import math
 from bisect import bisect_right
-from typing import Optional
+from typing import Optional, Sequence
 
 import numpy as np
 
@@ -231,10 +230,91 @@ def get_ratio_asset(assets: list[Asset]) -> dict:
     }
 
 
+def get_table_row(
+    name: str, origin: float, result: Sequence[float], simulation_time: int
+) -> dict:
+    """Returns a row of the density table from simulated profits
+
+    Args:
+        name: Name of the row
+        origin: Principal (元本) at the end of the horizon
+        result: Simulated profits (terminal price - origin) of each path
+        simulation_time: Number of simulated paths
+    """
+    _result = sorted(result)
+    _idx = bisect_right(_result, 0)
+    _prob = _idx / simulation_time * Constants.PERCENT_TO_DECIMAL
+
+    _top10 = (
+        _result[simulation_time // Constants.PERCENTILE_DIVISOR * 9]
+        // Constants.YEN_UNIT_DIVISOR
+    )
+    _top30 = (
+        _result[simulation_time // Constants.PERCENTILE_DIVISOR * 7]
+        // Constants.YEN_UNIT_DIVISOR
+    )
+    _worst30 = (
+        _result[simulation_time // Constants.PERCENTILE_DIVISOR * 3]
+        // Constants.YEN_UNIT_DIVISOR
+    )
+    _worst10 = (
+        _result[simulation_time // Constants.PERCENTILE_DIVISOR]
+        // Constants.YEN_UNIT_DIVISOR
+    )
+
+    return {
+        'name': name,
+        'originPrice': origin // Constants.YEN_UNIT_DIVISOR,
+        'top10': (
+            f'+{_top10:.0f}' if _top10 > 0 else f'{_top10:.0f}' if _top10 < 0 else '±0'
+        ),
+        'top30': (
+            f'+{_top30:.0f}' if _top30 > 0 else f'{_top30:.0f}' if _top30 < 0 else '±0'
+        ),
+        'worst30': (
+            f'+{_worst30:.0f}'
+            if _worst30 > 0
+            else f'{_worst30:.0f}' if _worst30 < 0 else '±0'
+        ),
+        'worst10': (
+            f'+{_worst10:.0f}'
+            if _worst10 > 0
+            else f'{_worst10:.0f}' if _worst10 < 0 else '±0'
+        ),
+        'prob': f'{_prob:.2f} %',
+    }
+
+
+def get_histogram(result_total: np.ndarray, simulation_time: int) -> np.ndarray:
+    """Returns [[bin, ratio], ...] of simulated profits in ascending order of bin"""
+    result_total = np.sort(result_total)
+
+    _min = result_total[0]
+    _max = result_total[-1]
+    _range = (_max - _min) // Constants.PERCENTILE_DIVISOR
+
+    result_total = (result_total - _min) // _range * _range
+    result_total = result_total - (_range // Constants.RANGE_DIVISOR) + _min
+    result_total = result_total // Constants.YEN_UNIT_DIVISOR
+
+    bins, counts = np.unique(result_total, return_counts=True)
+    return np.column_stack([bins, counts / simulation_time])
+
+
 def get_density_dist(
-    assets: list[Asset], simulation_time: int = Constants.DEFAULT_SIMULATION_TIME
+    assets: list[Asset],
+    simulation_time: int = Constants.DEFAULT_SIMULATION_TIME,
+    random_state: Optional[np.random.RandomState] = None,
 ) -> dict:
-    """Returns the density distribution of assets"""
+    """Returns the density distribution of assets
+
+    Args:
+        assets (list[Asset]): List of Asset objects
+        simulation_time (int): Number of simulated paths
+        random_state (Optional[np.random.RandomState]): Random generator of
+            this call; the global `np.random` is used if None
+    """
+    rng = np.random if random_state is None else random_state
     max_year = max([asset.year for asset in assets])
     _result_total = np.zeros(simulation_time)
     table_rows = []
@@ -244,7 +324,7 @@ def get_density_dist(
 
         for _ in range(simulation_time):
             now_price = asset.init_fund
-            random_norm = np.random.normal(
+            random_norm = rng.normal(
                 loc=asset.yld_month,
                 scale=asset.volatility_month,
                 size=max_year * Constants.MONTHS_IN_YEAR,
@@ -264,72 +344,9 @@ def get_density_dist(
             result.append(now_price - _origin)
 
         _result_total += np.array(result)
+        table_rows.append(get_table_row(asset.name, _origin, result, simulation_time))
 
-        _result = sorted(result)
-        _idx = bisect_right(_result, 0)
-        _prob = _idx / simulation_time * Constants.PERCENT_TO_DECIMAL
-
-        _top10 = (
-            _result[simulation_time // Constants.PERCENTILE_DIVISOR * 9]
-            // Constants.YEN_UNIT_DIVISOR
-        )
-        _top30 = (
-            _result[simulation_time // Constants.PERCENTILE_DIVISOR * 7]
-            // Constants.YEN_UNIT_DIVISOR
-        )
-        _worst30 = (
-            _result[simulation_time // Constants.PERCENTILE_DIVISOR * 3]
-            // Constants.YEN_UNIT_DIVISOR
-        )
-        _worst10 = (
-            _result[simulation_time // Constants.PERCENTILE_DIVISOR]
-            // Constants.YEN_UNIT_DIVISOR
-        )
-
-        table_rows.append(
-            {
-                'name': asset.name,
-                'originPrice': _origin // Constants.YEN_UNIT_DIVISOR,
-                'top10': (
-                    f'+{_top10:.0f}'
-                    if _top10 > 0
-                    else f'{_top10:.0f}' if _top10 < 0 else '±0'
-                ),
-                'top30': (
-                    f'+{_top30:.0f}'
-                    if _top30 > 0
-                    else f'{_top30:.0f}' if _top30 < 0 else '±0'
-                ),
-                'worst30': (
-                    f'+{_worst30:.0f}'
-                    if _worst30 > 0
-                    else f'{_worst30:.0f}' if _worst30 < 0 else '±0'
-                ),
-                'worst10': (
-                    f'+{_worst10:.0f}'
-                    if _worst10 > 0
-                    else f'{_worst10:.0f}' if _worst10 < 0 else '±0'
-                ),
-                'prob': f'{_prob:.2f} %',
-            }
-        )
-
-    result_total = list(_result_total)
-    result_total = sorted(result_total)
-
-    _min = result_total[0]
-    _max = result_total[-1]
-    _range = (_max - _min) // Constants.PERCENTILE_DIVISOR
-
-    result_total = [r - _min for r in result_total]
-    result_total = [r // _range * _range for r in result_total]
-    result_total = [
-        r - (_range // Constants.RANGE_DIVISOR) + _min for r in result_total
-    ]
-    result_total = [r // Constants.YEN_UNIT_DIVISOR for r in result_total]
-
-    cnt_result = collections.Counter(result_total).items()
-    data = [[k, v / simulation_time] for k, v in cnt_result]
+    data = get_histogram(_result_total, simulation_time)
 
     return {'data': data, 'tableRows': table_rows}
 
@@ -395,3 +412,29 @@ def get_demolition_price(assets: list[Asset], duration: int) -> dict:
         'demolitionPrice': demolition_per_year_total // Constants.YEN_UNIT_DIVISOR,
         'priceTransition': price_transition,
     }
+
+
+def get_calculation_result(params: list[tuple[str, list[float]]]) -> dict:
+    """Returns all charts of the calculation for the parsed parameters
+
+    Args:
+        params (list[tuple[str, list[float]]]): (stock name, stock data) pairs
+    Returns:
+        dict: Charts keyed by their use
+    """
+    assets = [Asset(stock_name, *stock_data) for stock_name, stock_data in params]
+    for A in assets:
+        A.set_price_transition()
+
+    res = {}
+    res['transition'] = get_total_transition(assets)  # Using Transition Chart
+    res['pie'] = get_ratio_asset(assets)  # Using Pie Chart
+    # own generator per call: the global one is shared by concurrent requests
+    res['density'] = get_density_dist(
+        assets, random_state=np.random.RandomState(1)
+    )  # Using Density Chart
+    res['bar'] = get_dividend_price(assets)  # Using Bar Chart
+    res['demolition'] = get_demolition_price(
+        assets, duration=20
+    )  # Using Demolition Chart
+    return res
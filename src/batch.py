@@ -0,0 +1,255 @@
+"""
+Offline batch runner computing /calculation results for saved portfolios
+
+Usage:
+    python src/batch.py portfolios.jsonl -o results.jsonl [--npz-dir DIR]
+
+Input (streamed, one portfolio per line / group of rows):
+    JSONL: {"id": "p1", "assets": {"三菱UFJ": [3.3, 4.1, 8, 5000, 300000, 1, 3.2, 1]}}
+    CSV:   id,name,yld,div,year,reserved,init_fund,is_jp,volatility,no_tax
+           (consecutive rows with the same id form a portfolio)
+
+Results are appended to the output in input order. A portfolio that cannot
+be parsed or computed gets an {"id": ..., "error": ...} line instead, and
+the run goes on. The checkpoint records how many portfolios and bytes were
+written, so a rerun with the same arguments resumes after the last
+completed portfolio.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Any, Iterator, Optional, Union
+
+import numpy as np
+
+from asset_calc import get_calculation_result
+from serialization import encode_json
+
+
+class BatchConstants:
+    """Constants used in the batch runner"""
+
+    CSV_COLUMNS = [
+        'yld',
+        'div',
+        'year',
+        'reserved',
+        'init_fund',
+        'is_jp',
+        'volatility',
+        'no_tax',
+    ]
+    CHECKPOINT_EVERY = 100  # portfolios between checkpoints
+    REPORT_INTERVAL = 10.0  # seconds between throughput reports
+
+
+# (id, stocks), or (id, error message) when the input could not be parsed
+Portfolio = tuple[Optional[str], Union[list[tuple[str, list[float]]], str]]
+
+
+def _parse_stock_data(value: Any) -> list[float]:
+    if isinstance(value, str):
+        value = value.split(',')
+    return list(map(float, value))
+
+
+def read_jsonl(path: str) -> Iterator[Portfolio]:
+    """Stream portfolios from a JSONL file"""
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            portfolio_id = None
+            try:
+                record = json.loads(line)
+                portfolio_id = str(record['id'])
+                params = [
+                    (name, _parse_stock_data(data))
+                    for name, data in record['assets'].items()
+                ]
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                yield portfolio_id, f'line {line_number}: {type(e).__name__}: {e}'
+                continue
+            yield portfolio_id, params
+
+
+def read_csv(path: str) -> Iterator[Portfolio]:
+    """Stream portfolios from a CSV file grouped by consecutive ids"""
+    with open(path, encoding='utf-8', newline='') as f:
+        for portfolio_id, rows in itertools.groupby(
+            csv.DictReader(f), key=lambda row: row.get('id')
+        ):
+            try:
+                params = [
+                    (
+                        row['name'],
+                        [float(row[col]) for col in BatchConstants.CSV_COLUMNS],
+                    )
+                    for row in rows
+                ]
+            except (KeyError, TypeError, ValueError) as e:
+                yield portfolio_id, f'{type(e).__name__}: {e}'
+                continue
+            yield portfolio_id, params
+
+
+def read_portfolios(path: str) -> Iterator[Portfolio]:
+    """Stream portfolios from a CSV or JSONL file"""
+    if path.endswith('.csv'):
+        return read_csv(path)
+    return read_jsonl(path)
+
+
+def run_portfolio(index: int, portfolio: Portfolio, npz_dir: Optional[str]) -> bytes:
+    """Compute one portfolio and return its output line"""
+    portfolio_id, params = portfolio
+    record: dict[str, Any] = {'id': portfolio_id}
+    if isinstance(params, str):
+        record['error'] = params
+        return encode_json(record) + b'\n'
+    try:
+        res = get_calculation_result(params)
+        if npz_dir:
+            record['npz'] = f'{index:08d}.npz'
+            save_npz(os.path.join(npz_dir, record['npz']), res)
+        else:
+            record['result'] = res
+    except Exception as e:
+        record['error'] = str(e)
+    return encode_json(record) + b'\n'
+
+
+def save_npz(path: str, res: dict) -> None:
+    """Save the numeric arrays of a calculation result"""
+    np.savez_compressed(
+        path,
+        price_transition=res['transition']['priceTransition'],
+        capital_price_transition=res['transition']['capitalPriceTransition'],
+        density=res['density']['data'],
+        dividend_price=res['bar']['price'],
+        dividend_tax=res['bar']['tax'],
+        demolition=res['demolition']['priceTransition'],
+    )
+
+
+def load_checkpoint(path: str) -> dict:
+    """Return {'done': portfolios written, 'offset': bytes written}"""
+    if not os.path.exists(path):
+        return {'done': 0, 'offset': 0}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, done: int, offset: int) -> None:
+    """Write the checkpoint atomically"""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'done': done, 'offset': offset}, f)
+    os.replace(tmp_path, path)
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    checkpoint_path: str,
+    workers: int,
+    max_in_flight: int,
+    npz_dir: Optional[str] = None,
+) -> int:
+    """Run all portfolios and return the number computed in this run"""
+    checkpoint = load_checkpoint(checkpoint_path)
+    done = checkpoint['done']
+    if npz_dir:
+        os.makedirs(npz_dir, exist_ok=True)
+
+    # drop output written after the last checkpoint, then append
+    mode = 'r+b' if os.path.exists(output_path) else 'wb'
+    with (
+        open(output_path, mode) as out,
+        concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor,
+    ):
+        out.truncate(checkpoint['offset'])
+        out.seek(checkpoint['offset'])
+
+        portfolios = itertools.islice(
+            enumerate(read_portfolios(input_path)), done, None
+        )
+        pending: collections.deque = collections.deque()
+        start = last_report = time.perf_counter()
+        computed = 0
+
+        def write_result(future: concurrent.futures.Future) -> None:
+            nonlocal done, computed, last_report
+            out.write(future.result())
+            done += 1
+            computed += 1
+            if done % BatchConstants.CHECKPOINT_EVERY == 0:
+                out.flush()
+                save_checkpoint(checkpoint_path, done, out.tell())
+            now = time.perf_counter()
+            if now - last_report >= BatchConstants.REPORT_INTERVAL:
+                report(computed, now - start)
+                last_report = now
+
+        # keep a bounded window of portfolios in flight, written in order
+        for index, portfolio in portfolios:
+            pending.append(executor.submit(run_portfolio, index, portfolio, npz_dir))
+            if len(pending) >= max_in_flight:
+                write_result(pending.popleft())
+        while pending:
+            write_result(pending.popleft())
+
+        out.flush()
+        save_checkpoint(checkpoint_path, done, out.tell())
+        report(computed, time.perf_counter() - start)
+    return computed
+
+
+def report(computed: int, elapsed: float) -> None:
+    """Print the throughput to stderr"""
+    rate = computed / elapsed if elapsed > 0 else 0.0
+    print(
+        f'{computed} portfolios in {elapsed:.1f}s ({rate:.1f} portfolios/sec)',
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('input', help='portfolios (.csv or .jsonl)')
+    parser.add_argument('-o', '--output', required=True, help='results (.jsonl)')
+    parser.add_argument(
+        '--npz-dir', help='write raw arrays to NPZ files instead of inline JSON'
+    )
+    parser.add_argument(
+        '--checkpoint', help='checkpoint file (default: OUTPUT.checkpoint)'
+    )
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        '--max-in-flight',
+        type=int,
+        help='portfolios submitted but not written yet (default: 4 x workers)',
+    )
+    args = parser.parse_args()
+
+    run_batch(
+        input_path=args.input,
+        output_path=args.output,
+        checkpoint_path=args.checkpoint or f'{args.output}.checkpoint',
+        workers=args.workers,
+        max_in_flight=args.max_in_flight or 4 * args.workers,
+        npz_dir=args.npz_dir,
+    )
+
+
+if __name__ == '__main__':
+    main()
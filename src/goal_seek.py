@@ -0,0 +1,221 @@
+"""
+Goal-seek: required monthly contribution or years to reach a target amount
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+from asset_calc import Asset, Constants
+
+
+class GoalSeekConstants:
+    """Constants used in goal-seek"""
+
+    SEED = 1
+    SOLVE_RESERVED = 'reserved'
+    SOLVE_YEAR = 'year'
+    RESERVED_UNIT = 100  # round monthly contribution up to 100 yen
+
+    # Query parameters of /goal-seek that are not stocks
+    OPTIONS = ('target', 'probability', 'solve')
+
+
+def simulate_growth(
+    asset: Asset,
+    months: int,
+    simulation_time: int,
+    index: int = 0,
+) -> np.ndarray:
+    """Simulate monthly growth factors (1 + return) of an asset
+
+    Each asset has its own random stream seeded by its position, so the
+    shocks of an asset do not depend on the other assets.
+
+    Returns:
+        Array of shape (simulation_time, months)
+    """
+    rng = np.random.default_rng([GoalSeekConstants.SEED, index])
+    return 1 + rng.normal(
+        loc=asset.yld_month,
+        scale=asset.volatility_month,
+        size=(simulation_time, months),
+    )
+
+
+def get_suffix_growth(growth: np.ndarray) -> np.ndarray:
+    """Return the growth from each month until the end of the horizon
+
+    Args:
+        growth: Monthly growth factors of shape (..., paths, months)
+
+    Returns:
+        Array of shape (..., paths, months + 1) whose column t is the product
+        of growth factors of months t, ..., months - 1 (column `months` is 1)
+    """
+    suffix = np.ones(growth.shape[:-1] + (growth.shape[-1] + 1,))
+    suffix[..., :-1] = np.cumprod(growth[..., ::-1], axis=-1)[..., ::-1]
+    return suffix
+
+
+def get_terminal_components(
+    suffix: np.ndarray, contribution_months: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Decompose the terminal value into initial fund and contribution parts
+
+    The monthly recurrence `price = price * growth + reserved` gives a
+    terminal value of `init_fund * growth_part + reserved * contribution_part`
+    on every path, so candidate contributions are evaluated without simulating.
+
+    Args:
+        suffix: Output of `get_suffix_growth`
+        contribution_months: Number of months with contributions
+
+    Returns:
+        Tuple of (growth_part, contribution_part), each of shape (..., paths)
+    """
+    contribution_months = min(contribution_months, suffix.shape[-1] - 1)
+    return suffix[..., 0], suffix[..., 1 : contribution_months + 1].sum(axis=-1)
+
+
+def _get_probability(values: np.ndarray, target: float) -> float:
+    return float(np.mean(values >= target) * Constants.PERCENT_TO_DECIMAL)
+
+
+def solve_reserved(
+    assets: list[Asset],
+    target: float,
+    probability: float,
+    simulation_time: int = Constants.DEFAULT_SIMULATION_TIME,
+) -> dict:
+    """Find the minimum total monthly contribution reaching the target
+
+    The total contribution is split between assets in proportion to their
+    current `reserved` (equally if all are zero).
+    """
+    max_year = max([asset.year for asset in assets])
+    months = max_year * Constants.MONTHS_IN_YEAR
+    # shocks are simulated for MAX_YEARS so that both solvers share them
+    max_months = Constants.MAX_YEARS * Constants.MONTHS_IN_YEAR
+
+    total_reserved = sum(asset.reserved for asset in assets)
+    weights = [
+        asset.reserved / total_reserved if total_reserved > 0 else 1 / len(assets)
+        for asset in assets
+    ]
+
+    fixed = np.zeros(simulation_time)  # value from initial funds
+    per_reserved = np.zeros(simulation_time)  # value per 1 yen of contribution
+    for i, (asset, weight) in enumerate(zip(assets, weights)):
+        growth = simulate_growth(asset, max_months, simulation_time, i)
+        suffix = get_suffix_growth(growth[:, :months])
+        growth_part, contribution_part = get_terminal_components(
+            suffix, asset.year * Constants.MONTHS_IN_YEAR
+        )
+        fixed += asset.init_fund * growth_part
+        per_reserved += weight * contribution_part
+
+    # required contribution on each path; the answer is its quantile
+    with np.errstate(divide='ignore', invalid='ignore'):
+        required = np.where(
+            fixed >= target, 0.0, (target - fixed) / np.maximum(per_reserved, 0)
+        )
+    required = np.sort(np.nan_to_num(required, nan=np.inf))
+    k = math.ceil(probability / Constants.PERCENT_TO_DECIMAL * simulation_time)
+    required_k = float(required[max(k, 1) - 1])
+
+    reserved: Optional[int] = None
+    if math.isfinite(required_k):
+        unit = GoalSeekConstants.RESERVED_UNIT
+        reserved = math.ceil(required_k / unit) * unit
+        achieved = _get_probability(fixed + reserved * per_reserved, target)
+    else:
+        achieved = _get_probability(fixed, target)
+
+    return {
+        'solve': GoalSeekConstants.SOLVE_RESERVED,
+        'value': reserved,
+        'probability': round(achieved, 2),
+        'perAsset': [
+            {
+                'name': asset.name,
+                'reserved': (
+                    round(reserved * weight) if reserved is not None else None
+                ),
+            }
+            for asset, weight in zip(assets, weights)
+        ],
+    }
+
+
+def solve_year(
+    assets: list[Asset],
+    target: float,
+    probability: float,
+    simulation_time: int = Constants.DEFAULT_SIMULATION_TIME,
+) -> dict:
+    """Find the minimum number of years of contributions reaching the target
+
+    All assets contribute their `reserved` every month until the horizon.
+    The same shocks are reused for every candidate number of years.
+    """
+    max_months = Constants.MAX_YEARS * Constants.MONTHS_IN_YEAR
+    growths = [
+        simulate_growth(asset, max_months, simulation_time, i)
+        for i, asset in enumerate(assets)
+    ]
+
+    achieved = 0.0
+    for year in range(1, Constants.MAX_YEARS + 1):
+        months = year * Constants.MONTHS_IN_YEAR
+        values = np.zeros(simulation_time)
+        for asset, growth in zip(assets, growths):
+            growth_part, contribution_part = get_terminal_components(
+                get_suffix_growth(growth[:, :months]), months
+            )
+            values += asset.init_fund * growth_part + asset.reserved * contribution_part
+        achieved = _get_probability(values, target)
+        if achieved >= probability:
+            return {
+                'solve': GoalSeekConstants.SOLVE_YEAR,
+                'value': year,
+                'probability': round(achieved, 2),
+            }
+
+    return {
+        'solve': GoalSeekConstants.SOLVE_YEAR,
+        'value': None,
+        'probability': round(achieved, 2),
+    }
+
+
+def solve_goal(
+    assets: list[Asset],
+    target: float,
+    probability: float,
+    solve: str = GoalSeekConstants.SOLVE_RESERVED,
+    simulation_time: int = Constants.DEFAULT_SIMULATION_TIME,
+) -> dict:
+    """Returns the contribution or years reaching the target with a probability
+
+    Args:
+        assets (list[Asset]): List of Asset objects
+        target (float): Target amount of the portfolio (yen)
+        probability (float): Required probability of reaching the target (%)
+        solve (str): 'reserved' (monthly contribution) or 'year'
+        simulation_time (int): Number of simulated paths
+    Returns:
+        dict: Solution and the probability it achieves
+    """
+    if not 0 < probability <= Constants.PERCENT_TO_DECIMAL:
+        raise ValueError(f'probability must be in (0, 100]: {probability}')
+
+    res = {'target': target}
+    if solve == GoalSeekConstants.SOLVE_RESERVED:
+        res.update(solve_reserved(assets, target, probability, simulation_time))
+    elif solve == GoalSeekConstants.SOLVE_YEAR:
+        res.update(solve_year(assets, target, probability, simulation_time))
+    else:
+        raise ValueError(f'unknown solve target: {solve}')
+    return res
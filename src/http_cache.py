@@ -0,0 +1,110 @@
+"""
+HTTP caching (ETag / Cache-Control) for deterministic calculation results
+"""
+
+import functools
+import hashlib
+import json
+import os
+import urllib.parse
+from typing import Any, Callable, Optional
+
+from flask import make_response, request
+
+
+class HttpCacheConstants:
+    """Constants used in HTTP caching"""
+
+    DEFAULT_MAX_AGE = 3600  # seconds
+    ETAG_LENGTH = 32  # hex digits of the hash kept in the ETag
+
+
+def _canonicalize_value(value: str) -> list:
+    canonical: list = []
+    for v in value.split(','):
+        try:
+            canonical.append(float(v))
+        except ValueError:
+            canonical.append(v.strip())
+    return canonical
+
+
+def canonicalize_params(path: str, items: list[tuple[str, str]]) -> str:
+    """Return a canonical representation of a request
+
+    The order of parameters is kept because it is the order of the assets
+    in the response. Numbers are normalized so that e.g. `5` and `5.0` match.
+
+    Args:
+        path: Request path
+        items: Query parameters as (key, value) pairs
+
+    Returns:
+        Canonical JSON string
+    """
+    return json.dumps(
+        {
+            'path': path,
+            # results may change between deployed revisions (set by Cloud Run)
+            'revision': os.getenv('K_REVISION', ''),
+            'params': [
+                [urllib.parse.unquote(key), _canonicalize_value(value)]
+                for key, value in items
+            ],
+        },
+        ensure_ascii=False,
+        separators=(',', ':'),
+    )
+
+
+def params_hash(path: str, items: list[tuple[str, str]]) -> str:
+    """Return a stable hash of the canonicalized request"""
+    canonical = canonicalize_params(path, items)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[
+        : HttpCacheConstants.ETAG_LENGTH
+    ]
+
+
+def get_max_age() -> int:
+    """Max age of cached responses in seconds (env: CACHE_MAX_AGE)"""
+    return int(os.getenv('CACHE_MAX_AGE', HttpCacheConstants.DEFAULT_MAX_AGE))
+
+
+def conditional_get(bypass: Optional[Callable[[], bool]] = None) -> Callable:
+    """Answer If-None-Match with 304 and add ETag / Cache-Control headers
+
+    The ETag is computed from the query parameters only, so a matching
+    request is answered before any calculation runs.
+
+    Args:
+        bypass: Returns True if the current request must run the view and get
+            its response as is (e.g. profiled requests)
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if bypass is not None and bypass():
+                return view(*args, **kwargs)
+
+            etag = params_hash(request.path, list(request.args.items()))
+            max_age = get_max_age()
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+            response.vary.add('Accept-Encoding')
+            # Access-Control-Allow-Origin is set per request origin
+            response.vary.add('Origin')
+            return response
+
+        return wrapper
+
+    return decorator
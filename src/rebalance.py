@@ -0,0 +1,138 @@
+"""
+Portfolio simulation with periodic rebalancing to target weights
+"""
+
+import numpy as np
+
+from asset_calc import Asset, Constants, get_histogram, get_table_row
+
+
+class RebalanceConstants:
+    """Constants used in rebalancing simulation"""
+
+    SEED = 1
+    MONTHLY = 'monthly'
+    ANNUAL = 'annual'
+    INTERVAL_MONTHS = {MONTHLY: 1, ANNUAL: Constants.MONTHS_IN_YEAR}
+
+    # Query parameters of /rebalance that are not stocks
+    OPTIONS = ('rebalance',)
+
+
+def get_target_weights(assets: list[Asset], max_year: int) -> np.ndarray:
+    """Target weights in proportion to the principal (元本) of each asset"""
+    principal = np.array(
+        [asset.capital_price_transition[max_year] for asset in assets], dtype=float
+    )
+    if principal.sum() <= 0:
+        return np.full(len(assets), 1 / len(assets))
+    return principal / principal.sum()
+
+
+def simulate_rebalanced_portfolio(
+    assets: list[Asset],
+    rebalance: str = RebalanceConstants.ANNUAL,
+    simulation_time: int = Constants.DEFAULT_SIMULATION_TIME,
+) -> dict:
+    """Simulate all assets jointly, rebalancing to the target weights
+
+    Holdings are a (paths x assets) array updated month by month, so each
+    monthly step is vectorized over paths and assets. At each rebalancing the
+    gains realized by selling are taxed at CAPITAL_GAINS_TAX_RATE unless
+    the asset is held in NISA (`no_tax`), and the tax is paid from the
+    portfolio before it is reset to the target weights.
+
+    Args:
+        assets (list[Asset]): List of Asset objects
+        rebalance (str): 'monthly' or 'annual'
+        simulation_time (int): Number of simulated paths
+    Returns:
+        dict: Terminal values, cost basis and tax paid of each path
+    """
+    if rebalance not in RebalanceConstants.INTERVAL_MONTHS:
+        raise ValueError(f'unknown rebalance interval: {rebalance}')
+    interval = RebalanceConstants.INTERVAL_MONTHS[rebalance]
+
+    max_year = max([asset.year for asset in assets])
+    weights = get_target_weights(assets, max_year)
+    yld_month = np.array([asset.yld_month for asset in assets])
+    volatility_month = np.array([asset.volatility_month for asset in assets])
+    reserved = np.array([asset.reserved for asset in assets], dtype=float)
+    contribution_months = np.array(
+        [asset.year * Constants.MONTHS_IN_YEAR for asset in assets]
+    )
+    tax_rate = np.array(
+        [0.0 if asset.no_tax else Constants.CAPITAL_GAINS_TAX_RATE for asset in assets]
+    )
+
+    shape = (simulation_time, len(assets))
+    price = np.tile(
+        np.array([asset.init_fund for asset in assets], float), (shape[0], 1)
+    )
+    basis = price.copy()
+    tax_paid = np.zeros(simulation_time)
+
+    rng = np.random.default_rng(RebalanceConstants.SEED)
+    for month in range(max_year * Constants.MONTHS_IN_YEAR):
+        price *= 1 + rng.normal(loc=yld_month, scale=volatility_month, size=shape)
+        contribution = np.where(month < contribution_months, reserved, 0.0)
+        price += contribution
+        basis += contribution
+
+        if (month + 1) % interval:
+            continue
+
+        # sell overweight assets and tax the realized gains (the small extra
+        # sale needed to pay the tax itself is not taxed)
+        total = price.sum(axis=1, keepdims=True)
+        sell = np.maximum(price - weights * total, 0)
+        sell_ratio = np.divide(sell, price, out=np.zeros(shape), where=price > 0)
+        gain = sell_ratio * (price - basis)
+        tax = (np.maximum(gain, 0) * tax_rate).sum(axis=1, keepdims=True)
+        tax_paid += tax[:, 0]
+
+        # reset to the target weights of the after-tax total
+        rebalanced = weights * (total - tax)
+        kept_ratio = np.divide(
+            rebalanced, price, out=np.ones(shape), where=rebalanced < price
+        )
+        basis = np.where(
+            rebalanced < price, basis * kept_ratio, basis + rebalanced - price
+        )
+        price = rebalanced
+
+    return {
+        'price': price,
+        'basis': basis,
+        'taxPaid': tax_paid,
+        'weights': weights,
+    }
+
+
+def get_rebalanced_density_dist(
+    assets: list[Asset],
+    rebalance: str = RebalanceConstants.ANNUAL,
+    simulation_time: int = Constants.DEFAULT_SIMULATION_TIME,
+) -> dict:
+    """Returns the density distribution of the rebalanced portfolio
+
+    Profits are measured after the tax paid on rebalancing, against the total
+    principal, in the same format as `get_density_dist`.
+    """
+    max_year = max([asset.year for asset in assets])
+    simulated = simulate_rebalanced_portfolio(assets, rebalance, simulation_time)
+    origin = sum(asset.capital_price_transition[max_year] for asset in assets)
+    result = simulated['price'].sum(axis=1) - origin
+
+    return {
+        'rebalance': rebalance,
+        'weights': [
+            {'name': asset.name, 'y': round(float(weight), 4)}
+            for asset, weight in zip(assets, simulated['weights'])
+        ],
+        'data': get_histogram(result, simulation_time),
+        'tableRows': [
+            get_table_row('portfolio', origin, result, simulation_time),
+        ],
+        'taxPaid': float(np.median(simulated['taxPaid'])) // Constants.YEN_UNIT_DIVISOR,
+    }
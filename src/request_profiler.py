@@ -0,0 +1,157 @@
+"""
+Opt-in per-request profiling with cProfile
+"""
+
+import functools
+import glob
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from flask import make_response, request
+
+from utils import make_logger
+
+logger = make_logger()
+
+
+class ProfilingConstants:
+    """Constants used in request profiling"""
+
+    HEADER = 'X-Profile'  # request header asking for a profile ("1")
+    FILE_HEADER = 'X-Profile-File'  # response header with the written file name
+    DEFAULT_DIR = '/tmp/profiles'
+    DEFAULT_MIN_INTERVAL = 60.0  # seconds between two captures
+    DEFAULT_MAX_FILES = 20  # older files are deleted
+
+
+class ProfileCapture:
+    """Rate-limited writer of cProfile captures to a local directory"""
+
+    def __init__(self, directory: str, min_interval: float, max_files: int):
+        self.directory = directory
+        self.min_interval = min_interval
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._last_started = -math.inf
+
+    def begin(self) -> bool:
+        """Start a capture if none is running and the rate limit allows it
+
+        Returns:
+            True if the caller may profile, in which case `end` must be called
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        now = time.monotonic()
+        if now - self._last_started < self.min_interval:
+            self._lock.release()
+            return False
+        self._last_started = now
+        return True
+
+    def end(self, profiler: Any, name: str) -> Optional[str]:
+        """Write the profile as a pstats file and finish the capture
+
+        Args:
+            profiler: cProfile.Profile that has been run
+            name: Name included in the file name (e.g. endpoint)
+
+        Returns:
+            Path of the written file, or None if it could not be written
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(
+                self.directory,
+                f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{name}.pstats',
+            )
+            profiler.dump_stats(path)
+            self._remove_old_files()
+            return path
+        except OSError as e:
+            logger.error(f'profile write error: {e}')
+            return None
+        finally:
+            self._lock.release()
+
+    def _remove_old_files(self) -> None:
+        files = sorted(
+            glob.glob(os.path.join(self.directory, '*.pstats')),
+            key=lambda path: (os.path.getmtime(path), path),
+        )
+        for path in files[: max(len(files) - self.max_files, 0)]:
+            os.remove(path)
+
+
+def make_profile_capture() -> Optional[ProfileCapture]:
+    """Create a capture configured from environment variables
+
+    Returns:
+        ProfileCapture, or None unless PROFILING_ENABLED is true
+    """
+    if os.getenv('PROFILING_ENABLED', 'false') != 'true':
+        return None
+    return ProfileCapture(
+        directory=os.getenv('PROFILING_DIR', ProfilingConstants.DEFAULT_DIR),
+        min_interval=float(
+            os.getenv('PROFILING_MIN_INTERVAL', ProfilingConstants.DEFAULT_MIN_INTERVAL)
+        ),
+        max_files=int(
+            os.getenv('PROFILING_MAX_FILES', ProfilingConstants.DEFAULT_MAX_FILES)
+        ),
+    )
+
+
+def is_profile_requested(
+    capture: Optional[ProfileCapture], is_allowed: Callable[[], bool]
+) -> bool:
+    """Return True if profiling is enabled and an allowed client asks for it"""
+    return (
+        capture is not None
+        and request.headers.get(ProfilingConstants.HEADER) == '1'
+        and is_allowed()
+    )
+
+
+def profiled(
+    capture: Optional[ProfileCapture], is_allowed: Callable[[], bool]
+) -> Callable:
+    """Profile the route when an allowed client sends the profiling header
+
+    Args:
+        capture: ProfileCapture, or None to disable profiling
+        is_allowed: Returns True if the current request may be profiled
+    """
+
+    def decorator(view: Callable) -> Callable:
+        if capture is None:
+            return view
+
+        @functools.wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not is_profile_requested(capture, is_allowed):
+                return view(*args, **kwargs)
+            if not capture.begin():
+                logger.info('profiling skipped: rate limited')
+                return view(*args, **kwargs)
+
+            import cProfile
+
+            profiler = cProfile.Profile()
+            try:
+                response = make_response(profiler.runcall(view, *args, **kwargs))
+            finally:
+                path = capture.end(profiler, request.endpoint or 'unknown')
+            if path:
+                logger.info(f'profile written: {path}')
+                response.headers[ProfilingConstants.FILE_HEADER] = os.path.basename(
+                    path
+                )
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,211 @@
+"""
+Result cache shared by routes, with in-process and SQLite backends
+"""
+
+import collections
+import functools
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Optional, Protocol
+
+from flask import current_app, make_response, request
+
+from http_cache import params_hash
+from utils import make_logger
+
+if TYPE_CHECKING:
+    import sqlite3
+
+logger = make_logger()
+
+
+class ResultCacheConstants:
+    """Constants used in the result cache"""
+
+    DEFAULT_MAX_BYTES = 16 * 1024 * 1024  # 16 MiB
+    SQLITE_TIMEOUT = 30.0  # seconds to wait for a lock held by another worker
+
+
+class ResultCache(Protocol):
+    """Interface of result cache backends"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value, or None on a miss"""
+
+    def set(self, key: str, value: bytes) -> None:
+        """Store a value, evicting least recently used entries if needed"""
+
+
+class MemoryCache:
+    """LRU cache bounded by total bytes, local to the process"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: collections.OrderedDict[str, bytes] = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if (old := self._entries.pop(key, None)) is not None:
+                self._size -= len(old)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+class SQLiteCache:
+    """LRU cache bounded by total bytes, shared by processes through SQLite
+
+    Every write runs in a single transaction, so other workers never see a
+    partially written entry. Errors are logged and treated as cache misses.
+    sqlite3 is imported only when this backend is used.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+            'size INTEGER NOT NULL, accessed REAL NOT NULL)'
+        )
+        conn.execute(
+            'CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)'
+        )
+
+    def _connect(self) -> 'sqlite3.Connection':
+        import sqlite3
+
+        # connections can be used by neither other threads nor forked workers
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path,
+                timeout=ResultCacheConstants.SQLITE_TIMEOUT,
+                isolation_level=None,
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        import sqlite3
+
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                'SELECT value FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                'UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), key)
+            )
+            return row[0]
+        except sqlite3.Error as e:
+            logger.warning(f'result cache get error: {e}')
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        import sqlite3
+
+        if len(value) > self.max_bytes:
+            return
+        try:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute(
+                    'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+                    (key, value, len(value), time.time()),
+                )
+                self._evict(conn)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f'result cache set error: {e}')
+
+    def _evict(self, conn: 'sqlite3.Connection') -> None:
+        """Delete least recently used entries until the cache fits"""
+        excess = (
+            conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            - self.max_bytes
+        )
+        if excess <= 0:
+            return
+        evicted = []
+        for key, size in conn.execute(
+            'SELECT key, size FROM entries ORDER BY accessed'
+        ):
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany('DELETE FROM entries WHERE key = ?', evicted)
+
+
+def make_result_cache() -> ResultCache:
+    """Create a cache configured from environment variables
+
+    RESULT_CACHE_PATH selects the SQLite backend shared by all workers on the
+    host; otherwise each process has its own in-memory cache.
+    """
+    max_bytes = int(
+        os.getenv('RESULT_CACHE_MAX_BYTES', ResultCacheConstants.DEFAULT_MAX_BYTES)
+    )
+    if path := os.getenv('RESULT_CACHE_PATH'):
+        return SQLiteCache(path, max_bytes)
+    return MemoryCache(max_bytes)
+
+
+def cached_response(
+    cache: ResultCache, bypass: Optional[Callable[[], bool]] = None
+) -> Callable:
+    """Serve successful JSON responses of the route from the cache
+
+    The key is the hash of the canonicalized request (same as the ETag), so
+    a hit skips admission control and the calculation.
+
+    Args:
+        cache: Cache storing the response bodies
+        bypass: Returns True if the current request must run the view without
+            using the cache (e.g. profiled requests)
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if bypass is not None and bypass():
+                return view(*args, **kwargs)
+
+            key = f'response:{params_hash(request.path, list(request.args.items()))}'
+            if (body := cache.get(key)) is not None:
+                return current_app.response_class(body, mimetype='application/json')
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                cache.set(key, response.get_data())
+            return response
+
+        return wrapper
+
+    return decorator
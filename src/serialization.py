@@ -0,0 +1,108 @@
+"""
+JSON serialization and compression of API responses
+"""
+
+import functools
+import gzip
+from typing import Any, Optional
+
+import numpy as np
+import orjson
+from flask import Response, current_app, request
+
+
+class SerializationConstants:
+    """Constants used in response serialization"""
+
+    # Decimal places kept for floats (density ratios need 1 / simulation time)
+    FLOAT_PRECISION = 4
+
+    # Compression
+    MIN_COMPRESS_SIZE = 1024  # bytes
+    GZIP_LEVEL = 6
+
+
+def _encode_numpy(obj: Any, precision: int) -> Any:
+    """Encode NumPy values that orjson passes to `default`
+
+    Arrays are rounded as a whole and encoded natively by orjson. Scalars
+    are converted here because `np.float64` would otherwise be encoded as
+    a float without rounding.
+    """
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == 'f':
+            obj = np.round(obj, precision)
+        return orjson.Fragment(
+            orjson.dumps(np.ascontiguousarray(obj), option=orjson.OPT_SERIALIZE_NUMPY)
+        )
+    if isinstance(obj, np.floating):
+        return round(float(obj), precision)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def encode_json(
+    obj: Any, precision: int = SerializationConstants.FLOAT_PRECISION
+) -> bytes:
+    """Encode an object including NumPy arrays into compact UTF-8 JSON
+
+    Args:
+        obj: Object to encode
+        precision: Decimal places kept for NumPy floats and arrays
+
+    Returns:
+        Encoded JSON (NaN and infinity are encoded as null)
+    """
+    return orjson.dumps(
+        obj, default=functools.partial(_encode_numpy, precision=precision)
+    )
+
+
+def compress(body: bytes, accepted: set[str]) -> tuple[bytes, Optional[str]]:
+    """Compress a body with gzip when the client accepts it
+
+    Args:
+        body: Encoded response body
+        accepted: Content encodings accepted by the client
+
+    Returns:
+        Tuple of (body, content encoding or None if not compressed)
+    """
+    if len(body) < SerializationConstants.MIN_COMPRESS_SIZE:
+        return body, None
+    if 'gzip' in accepted:
+        return (
+            gzip.compress(body, compresslevel=SerializationConstants.GZIP_LEVEL),
+            'gzip',
+        )
+    return body, None
+
+
+def make_json_response(obj: Any, status: int = 200) -> Response:
+    """Build an uncompressed JSON response (compressed by `compress_response`)"""
+    return current_app.response_class(
+        encode_json(obj), status=status, mimetype='application/json'
+    )
+
+
+def compress_response(response: Response) -> Response:
+    """Compress a JSON response when the client accepts it (after_request hook)
+
+    Compression is done after the route so that cached bodies stay
+    independent of the client's Accept-Encoding.
+    """
+    if (
+        response.mimetype != 'application/json'
+        or response.direct_passthrough
+        or 'Content-Encoding' in response.headers
+    ):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    accepted = {enc for enc in ('gzip',) if request.accept_encodings[enc]}
+    body, encoding = compress(response.get_data(), accepted)
+    if encoding:
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+    return response
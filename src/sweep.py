@@ -0,0 +1,197 @@
+"""
+Parameter sweep: terminal outcome over a grid of yields, volatilities and contributions
+"""
+
+import math
+from typing import Mapping, Optional
+
+import numpy as np
+
+from admission import estimate_cost
+from asset_calc import Asset, Constants
+from goal_seek import get_suffix_growth, get_terminal_components
+
+
+class SweepConstants:
+    """Constants used in parameter sweep"""
+
+    SEED = 1
+    SIMULATION_TIME = 500
+    MAX_STEPS = 11  # grid points per parameter
+
+    # A path-month of the broadcast sweep costs about 1/25 of the Python loop
+    # of `get_density_dist` (measured); the budget discounts it by only 1/10
+    # to leave headroom
+    VECTORIZED_COST_RATIO = 10
+
+    # Elements of each (volatility, paths, months) temporary array, so that
+    # peak memory does not grow with the grid (2 MB per float64 array)
+    CHUNK_ELEMENTS = 250_000
+
+    # Query parameters of /sweep that are not stocks
+    RANGES = ('yld', 'volatility', 'reserved')
+    OPTIONS = ('asset',) + RANGES
+
+
+def parse_range(value: Optional[str]) -> Optional[np.ndarray]:
+    """Parse "start,stop,steps" into evenly spaced grid points
+
+    Returns:
+        Array of grid points, or None if the range is not given
+    """
+    if value is None:
+        return None
+    start, stop, steps = value.split(',')
+    num = int(steps)
+    if not 1 <= num <= SweepConstants.MAX_STEPS:
+        raise ValueError(f'steps must be in [1, {SweepConstants.MAX_STEPS}]: {num}')
+    return np.linspace(float(start), float(stop), num)
+
+
+def parse_sweep_options(args: Mapping[str, str]) -> dict:
+    """Parse the sweep options of a request
+
+    Returns:
+        dict: 'asset' (name or None) and the grid of each parameter (or None)
+    """
+    options: dict = {'asset': args.get('asset')}
+    for name in SweepConstants.RANGES:
+        options[name] = parse_range(args.get(name))
+    return options
+
+
+def estimate_sweep_cost(
+    params: list[tuple[str, list[float]]], options: dict, simulation_time: int
+) -> int:
+    """Estimate the computation cost of a sweep before running it
+
+    Every yield x volatility point needs its own paths for the swept assets,
+    while the contribution axis is evaluated by broadcasting the terminal
+    decomposition, so it does not scale the cost. The result is in the same
+    unit as `estimate_cost`.
+    """
+    asset_params = [stock_data for _, stock_data in params]
+    swept = [
+        stock_data
+        for name, stock_data in params
+        if options['asset'] is None or name == options['asset']
+    ]
+    points = math.prod(
+        len(options[name]) if options[name] is not None else 1
+        for name in ('yld', 'volatility')
+    )
+    cost = estimate_cost(asset_params, simulation_time) + estimate_cost(
+        swept, simulation_time
+    ) * (points - 1)
+    return math.ceil(cost / SweepConstants.VECTORIZED_COST_RATIO)
+
+
+def sweep_parameters(
+    assets: list[Asset],
+    asset: Optional[str] = None,
+    yld: Optional[np.ndarray] = None,
+    volatility: Optional[np.ndarray] = None,
+    reserved: Optional[np.ndarray] = None,
+    simulation_time: int = SweepConstants.SIMULATION_TIME,
+) -> dict:
+    """Returns the terminal outcome over a grid of parameters
+
+    With `asset`, the grids are absolute values of that asset (yield and
+    volatility in %, monthly contribution in yen). Without it the whole
+    portfolio is swept: yield and volatility grids are offsets (in % points)
+    added to every asset, and the contribution grid is the total monthly
+    contribution split in proportion to the current `reserved`. Parameters
+    without a grid stay at their current value.
+
+    Each asset shares one set of standard normal shocks across the grid, and
+    the terminal value `init_fund * growth_part + reserved * contribution_part`
+    is broadcast over the contribution axis.
+
+    Args:
+        assets (list[Asset]): List of Asset objects
+        asset (Optional[str]): Name of the swept asset, or None for all
+        yld (Optional[np.ndarray]): Grid of expected yields (%)
+        volatility (Optional[np.ndarray]): Grid of volatilities (%)
+        reserved (Optional[np.ndarray]): Grid of monthly contributions (yen)
+        simulation_time (int): Number of simulated paths
+    Returns:
+        dict: Grid axes, and median terminal value (万円) and loss probability
+            (%) of shape (yld, volatility, reserved)
+    """
+    names = [a.name for a in assets]
+    if asset is not None and asset not in names:
+        raise ValueError(f'unknown asset: {asset}')
+    swept = [asset is None or a.name == asset for a in assets]
+
+    total_reserved = sum(a.reserved for a in assets)
+    if asset is None:
+        yld = np.zeros(1) if yld is None else yld
+        volatility = np.zeros(1) if volatility is None else volatility
+        reserved = np.array([total_reserved]) if reserved is None else reserved
+    else:
+        target = assets[names.index(asset)]
+        if yld is None:
+            yld = np.array([target.yld * Constants.PERCENT_TO_DECIMAL])
+        if volatility is None:
+            volatility = np.array([target.volatility * Constants.PERCENT_TO_DECIMAL])
+        if reserved is None:
+            reserved = np.array([target.reserved], dtype=float)
+
+    max_year = max([a.year for a in assets])
+    months = max_year * Constants.MONTHS_IN_YEAR
+    shape = (len(yld), len(volatility), len(reserved), simulation_time)
+    total = np.zeros(shape)
+    origin = np.zeros(len(reserved))
+    for i, (a, is_swept) in enumerate(zip(assets, swept)):
+        if not is_swept:
+            asset_yld = np.array([a.yld])
+            asset_volatility = np.array([a.volatility])
+            asset_reserved = np.array([a.reserved], dtype=float)
+        elif asset is None:
+            weight = (
+                a.reserved / total_reserved if total_reserved > 0 else 1 / len(assets)
+            )
+            asset_yld = a.yld + yld / Constants.PERCENT_TO_DECIMAL
+            asset_volatility = np.maximum(
+                a.volatility + volatility / Constants.PERCENT_TO_DECIMAL, 0
+            )
+            asset_reserved = reserved * weight
+        else:
+            asset_yld = yld / Constants.PERCENT_TO_DECIMAL
+            asset_volatility = volatility / Constants.PERCENT_TO_DECIMAL
+            asset_reserved = reserved
+
+        yld_month = (1 + asset_yld) ** (1 / Constants.MONTHS_IN_YEAR) - 1
+        volatility_month = asset_volatility / math.sqrt(Constants.MONTHS_IN_YEAR)
+        shocks = np.random.default_rng([SweepConstants.SEED, i]).standard_normal(
+            (simulation_time, months)
+        )
+        contribution_months = a.year * Constants.MONTHS_IN_YEAR
+        # one yield and a chunk of volatilities at a time bound the growth
+        # array (volatility chunk, paths, months) and its suffix products
+        chunk = max(SweepConstants.CHUNK_ELEMENTS // shocks.size, 1)
+        for j, mu in enumerate(yld_month):
+            for k in range(0, len(volatility_month), chunk):
+                growth = 1 + mu + volatility_month[k : k + chunk, None, None] * shocks
+                growth_part, contribution_part = get_terminal_components(
+                    get_suffix_growth(growth), contribution_months
+                )
+                terminal = (
+                    a.init_fund * growth_part[:, None, :]
+                    + asset_reserved[:, None] * contribution_part[:, None, :]
+                )
+                if is_swept:
+                    total[j, k : k + chunk] += terminal
+                else:
+                    total += terminal
+        origin += a.init_fund + asset_reserved * contribution_months
+
+    loss = total <= origin[:, None]
+    return {
+        'asset': asset,
+        'yld': yld,
+        'volatility': volatility,
+        'reserved': reserved,
+        'median': np.median(total, axis=-1) // Constants.YEN_UNIT_DIVISOR,
+        'prob': np.round(loss.mean(axis=-1) * Constants.PERCENT_TO_DECIMAL, 2),
+    }
@@ -0,0 +1,126 @@
+"""
+Test cases for admission.py
+"""
+
+import threading
+
+import pytest
+
+import src.app as app_module
+from src.admission import ConcurrencyLimiter, estimate_cost
+
+CALCULATION_URL = '/calculation?A=3.3,4.1,8,5000,300000,1,3.2,1'
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queued=0, queue_timeout=0.01)
+    monkeypatch.setattr(app_module, 'limiter', limiter)
+    monkeypatch.setattr(app_module.result_cache, 'get', lambda key: None)
+    return limiter
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def get_calculation_result(params):
+        calls.append(params)
+        return {}
+
+    monkeypatch.setattr(app_module, 'get_calculation_result', get_calculation_result)
+    return calls
+
+
+def test__estimate_cost():
+    asset_params = [
+        [3.3, 4.1, 8, 5000, 300000, 1, 3.2, 1],
+        [8, 1.8, 11, 5200, 200000, 0, 4.5, 1],
+    ]
+    assert estimate_cost(asset_params, 1000) == 2 * 20 * 12 * 1000
+    assert estimate_cost(asset_params, 0) == 2 * 20 * 12
+    assert estimate_cost(asset_params, 0, duration=50) == 2 * 50 * 12
+    assert estimate_cost([[3.3, 4.1, 100, 5000]], 1000) == 100 * 12 * 1000
+    assert estimate_cost([], 1000) == 0
+
+
+def test__limiter_rejects_when_queue_is_full():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queued=0, queue_timeout=0.01)
+    assert limiter.acquire()
+    assert not limiter.acquire()
+    limiter.release()
+    assert limiter.acquire()
+    limiter.release()
+    assert limiter.stats() == {
+        'admitted': 2,
+        'queued': 0,
+        'rejectedBusy': 1,
+        'rejectedCost': 0,
+        'waiting': 0,
+    }
+
+
+@pytest.mark.parametrize('released, expected', [(True, True), (False, False)])
+def test__limiter_queues_until_slot_is_free(released, expected):
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queued=1, queue_timeout=0.5)
+    assert limiter.acquire()
+    if released:
+        threading.Timer(0.05, limiter.release).start()
+    assert limiter.acquire() is expected
+    assert limiter.stats()['queued'] == 1
+
+
+def test__route_rejects_over_budget(limiter, calls, monkeypatch):
+    monkeypatch.setattr(app_module, 'max_request_cost', 100)
+    response = app_module.app.test_client().get(CALCULATION_URL)
+    assert response.status_code == 400
+    assert 'exceeds the budget' in response.get_json()['error']
+    assert calls == []
+    assert limiter.stats()['rejectedCost'] == 1
+
+
+def test__route_rejects_when_busy(limiter, calls):
+    assert limiter.acquire()
+    try:
+        response = app_module.app.test_client().get(CALCULATION_URL)
+    finally:
+        limiter.release()
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+    assert calls == []
+
+    response = app_module.app.test_client().get(CALCULATION_URL)
+    assert response.status_code == 200
+    assert len(calls) == 1
+
+
+def test__route_releases_slot_when_view_raises(limiter):
+    def view():
+        raise RuntimeError('calculation failed')
+
+    wrapped = app_module.admission_control(simulation_time=0)(view)
+    with app_module.app.test_request_context(CALCULATION_URL):
+        with pytest.raises(RuntimeError):
+            wrapped()
+    assert limiter.acquire()
+    limiter.release()
+
+
+def test__route_limits_malformed_requests(limiter, calls):
+    response = app_module.app.test_client().get('/calculation?A=abc')
+    assert response.status_code == 500
+    assert calls == []
+    assert limiter.stats()['admitted'] == 1
+
+
+@pytest.mark.parametrize(
+    'url',
+    [
+        '/calculation?A=3.3,4.1,inf,5000,300000,1,3.2,1',
+        '/re-calculation?A=3.3,4.1,8,5000,300000,1,3.2,1&d=inf',
+    ],
+)
+def test__route_reports_infinite_horizon(limiter, url):
+    response = app_module.app.test_client().get(url)
+    assert response.status_code == 500
+    assert 'error' in response.get_json()
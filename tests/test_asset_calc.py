@@ -2,10 +2,13 @@
 Test cases for asset_calc.py
 """
 
+import concurrent.futures
+
 import pytest
 
 from src.asset_calc import (
     Asset,
+    get_calculation_result,
     get_demolition_price,
     get_dividend_price,
     get_ratio_asset,
@@ -331,3 +334,17 @@ def test__get_demolition_price(asset1, asset2, asset3, asset4):
     assert (
         get_demolition_price([asset1, asset2, asset3, asset4], duration=20) == expected
     )
+
+
+def test__calculation_result_is_thread_safe():
+    portfolios = [
+        [('三菱UFJ', [3.3, 4.1, 8, 5000, 300000, 1, 3.2, 1])],
+        [('APPL', [8, 1.8, 11, 5200, 200000, 0, 4.5, 1])],
+    ]
+    expected = [get_calculation_result(params) for params in portfolios]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        for _ in range(3):
+            results = list(executor.map(get_calculation_result, portfolios))
+            for res, exp in zip(results, expected):
+                assert res['density']['tableRows'] == exp['density']['tableRows']
+                assert (res['density']['data'] == exp['density']['data']).all()
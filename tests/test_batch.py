@@ -0,0 +1,119 @@
+"""
+Test cases for batch.py
+"""
+
+import json
+
+from src.asset_calc import get_calculation_result
+from src.batch import read_portfolios, run_batch
+from src.serialization import encode_json
+
+STOCK_DATA = [3.3, 4.1, 8, 5000, 300000, 1, 3.2, 1]
+
+
+def write_jsonl(path, n):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(n):
+            f.write(
+                json.dumps({'id': f'p{i}', 'assets': {'三菱UFJ': STOCK_DATA}}) + '\n'
+            )
+        f.write(json.dumps({'id': 'bad', 'assets': {'三菱UFJ': [1, 2]}}) + '\n')
+
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test__read_csv_groups_consecutive_ids(tmp_path):
+    path = tmp_path / 'in.csv'
+    path.write_text(
+        'id,name,yld,div,year,reserved,init_fund,is_jp,volatility,no_tax\n'
+        'p0,A,3.3,4.1,8,5000,300000,1,3.2,1\n'
+        'p0,B,5,0,10,10000,0,0,15,0\n'
+        'p1,A,3.3,4.1,8,5000,300000,1,3.2,1\n',
+        encoding='utf-8',
+    )
+    portfolios = list(read_portfolios(str(path)))
+    assert [portfolio_id for portfolio_id, _ in portfolios] == ['p0', 'p1']
+    assert [name for name, _ in portfolios[0][1]] == ['A', 'B']
+    assert portfolios[1][1] == [('A', STOCK_DATA)]
+
+
+def test__run_batch_matches_calculation(tmp_path):
+    input_path, output_path = tmp_path / 'in.jsonl', tmp_path / 'out.jsonl'
+    write_jsonl(input_path, 3)
+    computed = run_batch(
+        str(input_path), str(output_path), str(tmp_path / 'ckpt'), 2, 2
+    )
+
+    lines = read_lines(output_path)
+    assert computed == 4
+    assert [line['id'] for line in lines] == ['p0', 'p1', 'p2', 'bad']
+    expected = json.loads(
+        encode_json(get_calculation_result([('三菱UFJ', STOCK_DATA)]))
+    )
+    assert lines[0]['result'] == expected
+    assert lines[0]['result'] == lines[2]['result']
+    assert 'error' in lines[3]
+
+
+def test__run_batch_resumes_from_checkpoint(tmp_path):
+    input_path, output_path = tmp_path / 'in.jsonl', tmp_path / 'out.jsonl'
+    checkpoint_path = tmp_path / 'ckpt'
+    write_jsonl(input_path, 3)
+    run_batch(str(input_path), str(output_path), str(checkpoint_path), 1, 1)
+    complete = output_path.read_bytes()
+
+    # simulate a crash after two portfolios with a partially written line
+    first_two = b''.join(complete.splitlines(keepends=True)[:2])
+    output_path.write_bytes(first_two + b'{"id":"p2","res')
+    checkpoint_path.write_text(json.dumps({'done': 2, 'offset': len(first_two)}))
+
+    computed = run_batch(str(input_path), str(output_path), str(checkpoint_path), 1, 1)
+    assert computed == 2
+    assert output_path.read_bytes() == complete
+    assert json.loads(checkpoint_path.read_text()) == {
+        'done': 4,
+        'offset': len(complete),
+    }
+
+
+def test__run_batch_reports_malformed_input(tmp_path):
+    input_path, output_path = tmp_path / 'in.jsonl', tmp_path / 'out.jsonl'
+    input_path.write_text(
+        json.dumps({'id': 'p0', 'assets': {'三菱UFJ': STOCK_DATA}})
+        + '\nnot json\n'
+        + json.dumps({'id': 'p2', 'assets': {'三菱UFJ': ['x'] * 8}})
+        + '\n'
+        + json.dumps({'id': 'p3', 'assets': {'三菱UFJ': STOCK_DATA}})
+        + '\n',
+        encoding='utf-8',
+    )
+    computed = run_batch(
+        str(input_path), str(output_path), str(tmp_path / 'ckpt'), 1, 2
+    )
+
+    lines = read_lines(output_path)
+    assert computed == 4
+    assert [line['id'] for line in lines] == ['p0', None, 'p2', 'p3']
+    assert lines[1]['error'].startswith('line 2: JSONDecodeError')
+    assert lines[2]['error'].startswith('line 3: ValueError')
+    assert lines[0]['result'] == lines[3]['result']
+
+
+def test__read_csv_reports_malformed_rows(tmp_path):
+    path = tmp_path / 'in.csv'
+    path.write_text(
+        'id,name,yld,div,year,reserved,init_fund,is_jp,volatility,no_tax\n'
+        'p0,A,3.3,4.1,8,5000,300000,1,3.2,1\n'
+        'p1,A,abc,4.1,8,5000,300000,1,3.2,1\n'
+        'p2,A,3.3,4.1\n'
+        'p3,A,3.3,4.1,8,5000,300000,1,3.2,1\n',
+        encoding='utf-8',
+    )
+    portfolios = list(read_portfolios(str(path)))
+    assert [portfolio_id for portfolio_id, _ in portfolios] == ['p0', 'p1', 'p2', 'p3']
+    assert portfolios[0][1] == portfolios[3][1] == [('A', STOCK_DATA)]
+    assert portfolios[1][1].startswith('ValueError')
+    assert portfolios[2][1].startswith('TypeError')
@@ -0,0 +1,83 @@
+"""
+Test cases for goal_seek.py
+"""
+
+import numpy as np
+import pytest
+
+from src.asset_calc import Asset
+from src.goal_seek import (
+    get_suffix_growth,
+    get_terminal_components,
+    simulate_growth,
+    solve_goal,
+)
+
+
+@pytest.fixture
+def assets():
+    return [
+        Asset('三菱UFJ', 5, 2, 10, 30000, 1000000, 1, 15, 1),
+        Asset('APPL', 7, 1, 8, 10000, 0, 0, 20, 0),
+    ]
+
+
+def simulate_terminal(asset, growth, reserved):
+    price = np.full(growth.shape[0], asset.init_fund)
+    for month in range(growth.shape[1]):
+        price = price * growth[:, month]
+        if month < asset.year * 12:
+            price += reserved
+    return price
+
+
+def test__get_terminal_components(assets):
+    asset = assets[1]
+    growth = simulate_growth(asset, 120, 50)
+    growth_part, contribution_part = get_terminal_components(
+        get_suffix_growth(growth), asset.year * 12
+    )
+    expected = simulate_terminal(asset, growth, 12345)
+    np.testing.assert_allclose(
+        asset.init_fund * growth_part + 12345 * contribution_part, expected
+    )
+
+
+def test__solve_reserved(assets):
+    res = solve_goal(assets, target=10_000_000, probability=80)
+    assert res['solve'] == 'reserved'
+    assert res['value'] % 100 == 0
+    assert res['probability'] >= 80
+    assert [r['reserved'] for r in res['perAsset']] == [
+        res['value'] * 0.75,
+        res['value'] * 0.25,
+    ]
+
+    def probability(reserved):
+        total = sum(
+            simulate_terminal(
+                asset, simulate_growth(asset, 240, 1000, i)[:, :120], reserved * weight
+            )
+            for i, (asset, weight) in enumerate(zip(assets, [0.75, 0.25]))
+        )
+        return np.mean(total >= 10_000_000) * 100
+
+    assert probability(res['value']) >= 80
+    assert probability(res['value'] - 100) < 80
+
+
+def test__solve_year(assets):
+    res = solve_goal(assets, target=10_000_000, probability=80, solve='year')
+    assert res['solve'] == 'year'
+    assert 1 <= res['value'] <= 20
+    assert res['probability'] >= 80
+
+    unreachable = solve_goal(assets, target=1e12, probability=80, solve='year')
+    assert unreachable['value'] is None
+
+
+def test__solve_goal_errors(assets):
+    with pytest.raises(ValueError):
+        solve_goal(assets, target=10_000_000, probability=0)
+    with pytest.raises(ValueError):
+        solve_goal(assets, target=10_000_000, probability=80, solve='foo')
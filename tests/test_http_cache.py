@@ -0,0 +1,67 @@
+"""
+Test cases for http_cache.py
+"""
+
+import pytest
+
+import src.app as app_module
+from src.http_cache import canonicalize_params, params_hash
+
+CALCULATION_URL = '/calculation?A=3.3,4.1,8,5000,300000,1,3.2,1'
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def get_calculation_result(params):
+        calls.append(params)
+        return {'density': {'data': [[0, 1.0]]}}
+
+    monkeypatch.setattr(app_module, 'get_calculation_result', get_calculation_result)
+    # bypass the result cache so that only conditional GET can skip the view
+    monkeypatch.setattr(app_module.result_cache, 'get', lambda key: None)
+    return calls
+
+
+def test__canonicalize_params():
+    assert canonicalize_params('/calculation', [('%E4%B8%89', '5,1.50')]) == (
+        '{"path":"/calculation","revision":"","params":[["三",[5.0,1.5]]]}'
+    )
+
+
+def test__params_hash():
+    items = [('A', '3.3,4.1,8'), ('B', '8,1.8,11')]
+    assert params_hash('/calculation', items) == params_hash(
+        '/calculation', [('A', '3.30,4.1,8.0'), ('B', '8,1.8,11')]
+    )
+    assert params_hash('/calculation', items) != params_hash(
+        '/calculation', items[::-1]
+    )
+    assert params_hash('/calculation', items) != params_hash('/re-calculation', items)
+
+
+def test__if_none_match_skips_calculation(calls):
+    client = app_module.app.test_client()
+    response = client.get(CALCULATION_URL)
+    assert response.status_code == 200
+    assert len(calls) == 1
+
+    etag = response.headers['ETag']
+    response = client.get(CALCULATION_URL, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert len(calls) == 1
+
+    response = client.get(CALCULATION_URL, headers={'If-None-Match': 'W/"other"'})
+    assert response.status_code == 200
+    assert len(calls) == 2
+
+
+def test__cache_headers_vary_by_origin(calls):
+    client = app_module.app.test_client()
+    response = client.get(CALCULATION_URL, headers={'Origin': 'https://a.example'})
+    assert response.headers['Cache-Control'] == 'public, max-age=3600'
+    assert {'Accept-Encoding', 'Origin'} <= {
+        value.strip() for value in response.headers['Vary'].split(',')
+    }
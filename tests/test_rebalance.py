@@ -0,0 +1,63 @@
+"""
+Test cases for rebalance.py
+"""
+
+import numpy as np
+import pytest
+
+from src.asset_calc import Asset, Constants
+from src.rebalance import get_rebalanced_density_dist, simulate_rebalanced_portfolio
+
+
+def make_assets(no_tax, volatility=0):
+    assets = [
+        Asset('三菱UFJ', 3, 0, 10, 5000, 300000, 1, volatility, no_tax),
+        Asset('GOOGL', 10, 0, 10, 5000, 300000, 0, volatility, no_tax),
+    ]
+    for A in assets:
+        A.set_price_transition()
+    return assets
+
+
+def test__no_rebalancing_needed():
+    # same yields keep the target weights, so nothing is sold
+    assets = [
+        Asset('A', 5, 0, 10, 5000, 300000, 1, 0, 0),
+        Asset('B', 5, 0, 10, 5000, 300000, 0, 0, 0),
+    ]
+    for A in assets:
+        A.set_price_transition()
+    res = simulate_rebalanced_portfolio(assets, 'monthly', simulation_time=10)
+    np.testing.assert_allclose(
+        res['price'].sum(axis=1), sum(A.price_transition[10] for A in assets)
+    )
+    np.testing.assert_allclose(res['taxPaid'], 0, atol=1e-6)
+
+
+@pytest.mark.parametrize('rebalance', ['monthly', 'annual'])
+def test__rebalancing_tax(rebalance):
+    taxable = simulate_rebalanced_portfolio(make_assets(no_tax=0), rebalance, 10)
+    nisa = simulate_rebalanced_portfolio(make_assets(no_tax=1), rebalance, 10)
+
+    assert np.all(taxable['taxPaid'] > 0)
+    np.testing.assert_allclose(nisa['taxPaid'], 0)
+    # the tax is paid from the portfolio and loses its growth afterwards
+    shortfall = nisa['price'].sum(axis=1) - taxable['price'].sum(axis=1)
+    assert np.all(shortfall >= taxable['taxPaid'])
+    # holdings are at the target weights after the last rebalancing
+    weights = taxable['price'] / taxable['price'].sum(axis=1, keepdims=True)
+    np.testing.assert_allclose(weights, [[0.5, 0.5]] * 10)
+
+
+def test__rebalanced_density_dist():
+    res = get_rebalanced_density_dist(make_assets(no_tax=0, volatility=15))
+    assert res['rebalance'] == 'annual'
+    assert [w['y'] for w in res['weights']] == [0.5, 0.5]
+    assert res['data'][:, 1].sum() == pytest.approx(1)
+    assert res['tableRows'][0]['originPrice'] == 1800000 // Constants.YEN_UNIT_DIVISOR
+    assert res['taxPaid'] > 0
+
+
+def test__unknown_rebalance():
+    with pytest.raises(ValueError):
+        simulate_rebalanced_portfolio(make_assets(no_tax=0), 'weekly')
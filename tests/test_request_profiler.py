@@ -0,0 +1,121 @@
+"""
+Test cases for request_profiler.py
+"""
+
+import cProfile
+import os
+import pstats
+
+import pytest
+from flask import Flask, jsonify, request
+
+from src.http_cache import conditional_get
+from src.request_profiler import ProfileCapture, is_profile_requested, profiled
+from src.result_cache import MemoryCache, cached_response
+
+ALLOWED = {'Origin': 'https://allowed.example'}
+
+
+@pytest.fixture
+def make_client():
+    """Test client of a route decorated in the same order as app.py"""
+
+    def make(capture):
+        app = Flask(__name__)
+        calls = []
+
+        def is_allowed():
+            return request.headers.get('Origin') == ALLOWED['Origin']
+
+        def bypass():
+            return is_profile_requested(capture, is_allowed)
+
+        @app.route('/calculation')
+        @conditional_get(bypass=bypass)
+        @cached_response(MemoryCache(1024), bypass=bypass)
+        @profiled(capture, is_allowed)
+        def calculation():
+            calls.append(request.args.to_dict())
+            return jsonify({'value': 1}), 200
+
+        return app.test_client(), calls
+
+    return make
+
+
+def test__profile_capture(tmp_path):
+    capture = ProfileCapture(str(tmp_path), min_interval=3600, max_files=1)
+    assert capture.begin()
+    # another capture cannot start while one is running
+    assert not capture.begin()
+
+    profiler = cProfile.Profile()
+    profiler.runcall(sum, range(10))
+    path = capture.end(profiler, 'calculation')
+    assert os.path.dirname(path) == str(tmp_path)
+    assert path.endswith('-calculation.pstats')
+    assert pstats.Stats(path).total_calls > 0
+
+    # rate limited by min_interval
+    assert not capture.begin()
+
+
+def test__profile_capture_removes_old_files(tmp_path):
+    capture = ProfileCapture(str(tmp_path), min_interval=0, max_files=2)
+    for i in range(3):
+        assert capture.begin()
+        profiler = cProfile.Profile()
+        profiler.runcall(sum, range(10))
+        capture.end(profiler, f'route{i}')
+    assert sorted(os.path.basename(p)[-13:] for p in tmp_path.iterdir()) == [
+        'route1.pstats',
+        'route2.pstats',
+    ]
+
+
+def test__profiled_requires_header_and_allowed_origin(tmp_path, make_client):
+    capture = ProfileCapture(str(tmp_path), min_interval=0, max_files=10)
+    client, _ = make_client(capture)
+
+    for url, headers in [
+        ('/calculation?a=1', ALLOWED),
+        ('/calculation?a=2', {'X-Profile': '1', 'Origin': 'https://other.example'}),
+        ('/calculation?a=3', {'X-Profile': '1'}),
+    ]:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        assert 'X-Profile-File' not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+    response = client.get('/calculation?a=4', headers={'X-Profile': '1', **ALLOWED})
+    assert response.status_code == 200
+    assert (tmp_path / response.headers['X-Profile-File']).exists()
+
+
+def test__profiled_disabled(make_client):
+    client, calls = make_client(None)
+    for _ in range(2):
+        response = client.get('/calculation', headers={'X-Profile': '1', **ALLOWED})
+        assert response.status_code == 200
+        assert 'X-Profile-File' not in response.headers
+    # without profiling the cache is used as usual
+    assert len(calls) == 1
+
+
+def test__profiled_skips_caches(tmp_path, make_client):
+    capture = ProfileCapture(str(tmp_path), min_interval=0, max_files=10)
+    client, calls = make_client(capture)
+    etag = client.get('/calculation', headers=ALLOWED).headers['ETag']
+    assert client.get('/calculation', headers=ALLOWED).status_code == 200
+    assert (
+        client.get('/calculation', headers={'If-None-Match': etag}).status_code == 304
+    )
+    assert len(calls) == 1
+
+    # a cached key is computed again when a profile is requested
+    response = client.get(
+        '/calculation', headers={'X-Profile': '1', 'If-None-Match': etag, **ALLOWED}
+    )
+    assert response.status_code == 200
+    assert (tmp_path / response.headers['X-Profile-File']).exists()
+    assert len(calls) == 2
@@ -0,0 +1,132 @@
+"""
+Test cases for result_cache.py
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+
+import src.app as app_module
+from src.result_cache import MemoryCache, SQLiteCache
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+# a portfolio used by no other test, so the shared app cache starts empty
+CALCULATION_URL = '/calculation?キャッシュ=3.3,4.1,8,5000,300000,1,3.2,1'
+
+# runs the route in a new process; FAIL makes the calculation raise
+ROUTE_SCRIPT = '''
+import os, sys, app
+if os.environ.get('FAIL'):
+    app.get_calculation_result = lambda params: 1 / 0
+response = app.app.test_client().get(sys.argv[1])
+print(response.status_code)
+'''
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_cache(request, tmp_path):
+    def make(max_bytes):
+        if request.param == 'memory':
+            return MemoryCache(max_bytes)
+        return SQLiteCache(str(tmp_path / 'cache.sqlite3'), max_bytes)
+
+    return make
+
+
+def test__cache_lru_eviction(make_cache):
+    cache = make_cache(max_bytes=10)
+    cache.set('a', b'1234')
+    cache.set('b', b'1234')
+    assert cache.get('a') == b'1234'  # 'b' becomes least recently used
+    cache.set('c', b'1234')
+    assert cache.get('a') == b'1234'
+    assert cache.get('b') is None
+    assert cache.get('c') == b'1234'
+
+    # values larger than the cache are not stored
+    cache.set('d', b'12345678901')
+    assert cache.get('d') is None
+
+
+def _write_entry(path):
+    SQLiteCache(path, 1024).set('shared', b'from child')
+
+
+def test__sqlite_cache_is_shared_by_processes(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = SQLiteCache(path, 1024)
+    process = multiprocessing.get_context('spawn').Process(
+        target=_write_entry, args=(path,)
+    )
+    process.start()
+    process.join()
+    assert cache.get('shared') == b'from child'
+
+
+def test__sqlite_is_imported_only_when_used():
+    env = {**os.environ, 'WARM_UP': 'false'}
+    env.pop('RESULT_CACHE_PATH', None)
+    proc = subprocess.run(
+        [sys.executable, '-c', 'import sys, app; print("sqlite3" in sys.modules)'],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert proc.stdout.strip() == 'False'
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def get_calculation_result(params):
+        calls.append(params)
+        if params[0][1][0] < 0:
+            raise ValueError('negative yield')
+        return {'value': params[0][1][0]}
+
+    monkeypatch.setattr(app_module, 'get_calculation_result', get_calculation_result)
+    return calls
+
+
+def test__route_serves_cached_response(calls):
+    client = app_module.app.test_client()
+    first = client.get(CALCULATION_URL)
+    second = client.get(CALCULATION_URL)
+    assert first.status_code == second.status_code == 200
+    assert second.get_data() == first.get_data()
+    assert len(calls) == 1
+
+
+def test__route_does_not_cache_errors(calls):
+    client = app_module.app.test_client()
+    url = CALCULATION_URL.replace('=3.3', '=-3.3')
+    assert client.get(url).status_code == 500
+    assert client.get(url).status_code == 500
+    assert len(calls) == 2
+
+
+def run_route(url, env):
+    proc = subprocess.run(
+        [sys.executable, '-c', ROUTE_SCRIPT, url],
+        cwd=SRC_DIR,
+        env={**os.environ, 'WARM_UP': 'false', **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(proc.stdout.splitlines()[-1])
+
+
+def test__route_cache_is_shared_by_processes(tmp_path):
+    env = {'RESULT_CACHE_PATH': str(tmp_path / 'cache.sqlite3')}
+    # without the shared entry the second process fails
+    assert run_route(CALCULATION_URL, {**env, 'FAIL': '1'}) == 500
+    assert run_route(CALCULATION_URL, env) == 200
+    assert run_route(CALCULATION_URL, {**env, 'FAIL': '1'}) == 200
@@ -0,0 +1,38 @@
+"""
+Test cases for serialization.py
+"""
+
+import gzip
+import json
+
+import numpy as np
+
+from src.serialization import compress, encode_json
+
+
+def test__encode_json():
+    data = {
+        'data': np.array([[130.0, 0.0161234], [174.0, 0.074]]),
+        'count': np.int64(3),
+        'ratio': np.float64(0.123456),
+        'values': [np.float32(0.5), np.float64(1.987654)],
+        'name': '三菱UFJ',
+        # non-contiguous views are copied before the native encoding
+        'order': np.array([3, 1, 2])[::-1],
+    }
+    body = encode_json(data)
+    assert body == (
+        '{"data":[[130.0,0.0161],[174.0,0.074]],"count":3,'
+        '"ratio":0.1235,"values":[0.5,1.9877],"name":"三菱UFJ","order":[2,1,3]}'
+    ).encode('utf-8')
+
+
+def test__compress():
+    small = b'{"a":1}'
+    assert compress(small, {'gzip'}) == (small, None)
+
+    large = json.dumps(list(range(1000))).encode('utf-8')
+    body, encoding = compress(large, {'gzip'})
+    assert encoding == 'gzip'
+    assert gzip.decompress(body) == large
+    assert compress(large, set()) == (large, None)
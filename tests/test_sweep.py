@@ -0,0 +1,107 @@
+"""
+Test cases for sweep.py
+"""
+
+import numpy as np
+import pytest
+
+from src.asset_calc import Asset
+from src.sweep import (
+    SweepConstants,
+    estimate_sweep_cost,
+    parse_range,
+    parse_sweep_options,
+    sweep_parameters,
+)
+
+
+@pytest.fixture
+def assets():
+    return [
+        Asset('三菱UFJ', 5, 2, 10, 30000, 1000000, 1, 15, 1),
+        Asset('APPL', 7, 1, 8, 10000, 0, 0, 20, 0),
+    ]
+
+
+def simulate_terminal(asset, yld, volatility, reserved, months, index):
+    shocks = np.random.default_rng([1, index]).standard_normal((200, months))
+    growth = 1 + ((1 + yld / 100) ** (1 / 12) - 1) + volatility / 100 / 12**0.5 * shocks
+    price = np.full(200, float(asset.init_fund))
+    for month in range(months):
+        price = price * growth[:, month]
+        if month < asset.year * 12:
+            price += reserved
+    return price
+
+
+def test__parse_range():
+    np.testing.assert_allclose(parse_range('1,9,5'), [1, 3, 5, 7, 9])
+    assert parse_range(None) is None
+    with pytest.raises(ValueError):
+        parse_range('1,9,100')
+
+
+def test__sweep_matches_simulation(assets):
+    res = sweep_parameters(
+        assets,
+        asset='APPL',
+        yld=np.array([3.0, 9.0]),
+        volatility=np.array([10.0, 30.0]),
+        reserved=np.array([0.0, 20000.0]),
+        simulation_time=200,
+    )
+    assert res['median'].shape == res['prob'].shape == (2, 2, 2)
+
+    fixed = simulate_terminal(assets[0], 5, 15, 30000, 120, 0)
+    total = fixed + simulate_terminal(assets[1], 9, 10, 20000, 120, 1)
+    origin = 1000000 + 30000 * 120 + 20000 * 96
+    assert res['median'][1, 0, 1] == np.median(total) // 10000
+    assert res['prob'][1, 0, 1] == pytest.approx(np.mean(total <= origin) * 100)
+
+
+def test__sweep_portfolio(assets):
+    res = sweep_parameters(
+        assets,
+        yld=np.array([-2.0, 0.0, 2.0]),
+        reserved=np.array([10000.0, 40000.0, 80000.0]),
+        simulation_time=200,
+    )
+    median = res['median'][:, 0, :]
+    assert (np.diff(median, axis=0) > 0).all()
+    assert (np.diff(median, axis=1) > 0).all()
+
+    # the current parameters are the zero offset with the current contribution
+    fixed = simulate_terminal(assets[0], 5, 15, 30000, 120, 0)
+    total = fixed + simulate_terminal(assets[1], 7, 20, 10000, 120, 1)
+    assert res['median'][1, 0, 1] == np.median(total) // 10000
+
+
+def test__sweep_unknown_asset(assets):
+    with pytest.raises(ValueError):
+        sweep_parameters(assets, asset='GOOGL', simulation_time=10)
+
+
+def test__estimate_sweep_cost():
+    params = [('A', [5, 2, 10, 0, 0, 1, 15, 1]), ('B', [7, 1, 8, 0, 0, 0, 20, 0])]
+    options = parse_sweep_options({'asset': 'A', 'yld': '1,9,5', 'reserved': '0,1,11'})
+    per_asset = 240 * 100
+    assert estimate_sweep_cost(params, options, 100) == (
+        (2 * per_asset + 4 * per_asset) // 10
+    )
+
+
+def test__sweep_chunks_volatility(assets, monkeypatch):
+    grid = dict(
+        asset='APPL',
+        yld=np.array([3.0, 9.0]),
+        volatility=np.linspace(5, 30, 5),
+        reserved=np.array([0.0, 20000.0]),
+        simulation_time=50,
+    )
+    monkeypatch.setattr(SweepConstants, 'CHUNK_ELEMENTS', 10**9)
+    expected = sweep_parameters(assets, **grid)
+    # two volatilities per chunk: 50 paths x 120 months each
+    monkeypatch.setattr(SweepConstants, 'CHUNK_ELEMENTS', 2 * 50 * 120)
+    res = sweep_parameters(assets, **grid)
+    np.testing.assert_array_equal(res['median'], expected['median'])
+    np.testing.assert_array_equal(res['prob'], expected['prob'])